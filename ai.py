@@ -0,0 +1,278 @@
+# Computer player searching the board with alpha-beta minimax
+import os
+import time
+
+from tablebase import DRAW, LOSS
+from transposition import TranspositionTable, DEFAULT_ENTRIES, EXACT, LOWER_BOUND, UPPER_BOUND
+
+
+MAN_VALUE = 1
+KING_VALUE = 1.5
+WIN_SCORE = 1000
+INFINITY = float("inf")
+
+# How many nodes are searched between two looks at the clock
+TIME_CHECK_INTERVAL = 1024
+
+# Evaluation weights written by tuner.py, the game's engine plays with them when the file exists
+WEIGHTS_FILE = os.getenv("CHECKERS_WEIGHTS", "weights.json")
+
+
+# Raised inside the search once the time budget is spent
+class SearchTimeout(Exception):
+    pass
+
+
+# Returns the tuned weights file when there is one, else None and the AI
+# counts material only
+def get_weights_file(path=WEIGHTS_FILE):
+    return path if os.path.exists(path) else None
+
+
+class AI:
+    # Initilize the AI with its color and search limits. A shared table can be
+    # passed in, its owner then starts each search with new_search(). Setting
+    # stop_event (anything with is_set()) ends a running search early. Positions
+    # found in the opening book are played without searching, and positions
+    # covered by the endgame tablebase are scored without searching further.
+    # With a batch evaluator (see evaluator.py) leaves are scored together,
+    # weights (a dict or a file written by tuner.py) set up one.
+    def __init__(self, color, max_depth=10, time_limit=1.0, table_entries=DEFAULT_ENTRIES,
+                 table=None, stop_event=None, book=None, tablebase=None, evaluator=None,
+                 weights=None):
+        self.color = color
+        self.max_depth = max_depth
+        self.time_limit = time_limit
+        self.owns_table = table is None
+        self.table = TranspositionTable(table_entries) if table is None else table
+        self.stop_event = stop_event
+        self.book = book
+        self.tablebase = tablebase
+        if weights is not None:
+            # NumPy is only needed by engines that use weights
+            from evaluator import BatchEvaluator, load_weights
+            evaluator = BatchEvaluator(load_weights(weights) if isinstance(weights, str) else weights)
+        self.evaluator = evaluator
+        self.deadline = None
+        self.nodes = 0
+        self.completed_depth = 0
+
+    # Return the color the AI plays
+    def get_color(self):
+        return self.color
+
+    # Change what ends a running search early
+    def set_stop_event(self, stop_event):
+        self.stop_event = stop_event
+
+    # Return the transposition table counters
+    def get_table_stats(self):
+        return self.table.get_stats()
+
+    # Returns the opposite color
+    def get_opponent(self, color):
+        return 'B' if color == 'W' else 'W'
+
+    # Scores the board from the point of view of the AI
+    def evaluate(self, board):
+        if self.evaluator is not None:
+            return self.evaluate_leaves(board, [None])[0]
+
+        own = board.get_color_mask(self.color)
+        opponent = board.get_color_mask(self.get_opponent(self.color))
+        if not opponent:
+            return WIN_SCORE
+        if not own:
+            return -WIN_SCORE
+
+        king_mask = board.get_king_mask()
+        men = own.bit_count() - opponent.bit_count()
+        kings = (own & king_mask).bit_count() - (opponent & king_mask).bit_count()
+        return men * MAN_VALUE + kings * (KING_VALUE - MAN_VALUE)
+
+    # Scores the positions reached by playing each move with the batch
+    # evaluator, a move of None scoring the board itself
+    def evaluate_leaves(self, board, moves):
+        white, black, kings = [], [], []
+        for move in moves:
+            token = board.make_move(move) if move is not None else None
+            white.append(board.get_color_mask('W'))
+            black.append(board.get_color_mask('B'))
+            kings.append(board.get_king_mask())
+            if token is not None:
+                board.unmake_move(token)
+        return self.evaluator.evaluate_masks(white, black, kings, self.color,
+                                             board.get_color_up() == 'W').tolist()
+
+    # Returns the legal moves of a color, best candidates first
+    def get_ordered_moves(self, board, color):
+        moves = board.get_legal_moves(color)
+        if len(moves) < 2:
+            return moves
+        if abs(moves[0][0] // 4 - moves[0][1] // 4) == 2:
+            # Captures eating the most pieces first
+            moves.sort(key=len, reverse=True)
+            return moves
+
+        # Moves that crown a piece are tried before the other quiet moves
+        king_row = 0 if color == board.get_color_up() else 7
+        kings = board.get_king_mask()
+        moves.sort(key=lambda move: not ((kings >> move[0]) & 1 == 0 and move[1] // 4 == king_row))
+        return moves
+
+    # Returns the best value reachable within depth moves, color is the side to move
+    def minimax(self, board, maximizing, depth, color, alpha=-INFINITY, beta=INFINITY):
+        self.nodes += 1
+        if self.deadline is not None and self.nodes % TIME_CHECK_INTERVAL == 0:
+            if time.perf_counter() > self.deadline:
+                raise SearchTimeout()
+            if self.stop_event is not None and self.stop_event.is_set():
+                raise SearchTimeout()
+
+        if self.tablebase is not None:
+            entry = self.tablebase.probe(board, color)
+            if entry is not None:
+                # A win in n plies scores like reaching the end of the game n plies deeper
+                result, distance = entry
+                if result == DRAW:
+                    return 0
+                score = WIN_SCORE + depth - distance
+                if result == LOSS:
+                    score = -score
+                return score if color == self.color else -score
+
+        if depth == 0:
+            return self.evaluate(board)
+        if board.get_turn() != color:
+            board = board.copy()
+            board.set_turn(color)
+
+        # Only nodes where the AI maximizes its own moves are cached, the
+        # stored scores would not mean the same thing the other way round
+        use_table = maximizing == (color == self.color)
+        table_move = None
+        if use_table:
+            key = board.get_hash()
+            entry = self.table.probe(key)
+            if entry is not None:
+                score, entry_depth, flag, table_move = entry
+                if entry_depth >= depth:
+                    if flag == EXACT:
+                        return score
+                    if flag == LOWER_BOUND:
+                        alpha = max(alpha, score)
+                    else:
+                        beta = min(beta, score)
+                    if alpha >= beta:
+                        return score
+        alpha_start, beta_start = alpha, beta
+
+        moves = self.get_ordered_moves(board, color)
+        if len(moves) == 0:
+            # The side to move is blocked or has no pieces left and loses
+            return -WIN_SCORE - depth if color == self.color else WIN_SCORE + depth
+        if table_move is not None:
+            for index, move in enumerate(moves):
+                if move[0] == table_move[0] and move[-1] == table_move[1]:
+                    moves.insert(0, moves.pop(index))
+                    break
+
+        best = -INFINITY if maximizing else INFINITY
+        best_move = None
+        if depth == 1 and self.evaluator is not None and self.tablebase is None:
+            # The children are all leaves: score them in one batch, counted as searched
+            # nodes. Tablebase probes need them one at a time, so they turn this off.
+            self.nodes += len(moves)
+            values = self.evaluate_leaves(board, moves)
+        else:
+            values = None
+        for index, move in enumerate(moves):
+            if values is not None:
+                value = values[index]
+            else:
+                token = board.make_move(move)
+                value = self.minimax(board, not maximizing, depth - 1, board.get_turn(), alpha, beta)
+                board.unmake_move(token)
+
+            if maximizing:
+                if value > best:
+                    best, best_move = value, move
+                alpha = max(alpha, value)
+            else:
+                if value < best:
+                    best, best_move = value, move
+                beta = min(beta, value)
+            if alpha >= beta:
+                break
+
+        if use_table:
+            if best <= alpha_start:
+                flag = UPPER_BOUND
+            elif best >= beta_start:
+                flag = LOWER_BOUND
+            else:
+                flag = EXACT
+            self.table.store(key, best, depth, flag, best_move)
+        return best
+
+    # Searches the root one depth at a time, returns (score, move) of the deepest finished depth.
+    # progress(depth, score, move, nodes) is called after every finished depth, and
+    # start_depth and root_shift let parallel helpers search differently from each other.
+    def search(self, board, progress=None, start_depth=1, root_shift=0):
+        self.nodes = 0
+        self.completed_depth = 0
+        self.deadline = time.perf_counter() + self.time_limit
+        if self.owns_table:
+            self.table.new_search()
+        # Moves are played and taken back on a private copy, so running out
+        # of time in the middle of a line leaves the caller's board untouched
+        board = board.copy()
+        board.set_turn(self.color)
+
+        if self.book is not None:
+            book_move = self.book.get_move(board)
+            if book_move is not None:
+                return None, book_move
+
+        moves = self.get_ordered_moves(board, self.color)
+        if len(moves) == 0:
+            return -WIN_SCORE, None
+        best_score, best_move = None, moves[0]
+        if len(moves) == 1:
+            return best_score, best_move
+        shift = root_shift % len(moves)
+        moves = moves[shift:] + moves[:shift]
+
+        try:
+            for depth in range(min(start_depth, self.max_depth), self.max_depth + 1):
+                alpha = -INFINITY
+                depth_move = None
+                for move in moves:
+                    token = board.make_move(move)
+                    value = self.minimax(board, False, depth - 1, board.get_turn(), alpha, INFINITY)
+                    board.unmake_move(token)
+                    if value > alpha:
+                        alpha, depth_move = value, move
+
+                best_score, best_move = alpha, depth_move
+                self.completed_depth = depth
+                if progress is not None:
+                    progress(depth, best_score, best_move, self.nodes)
+                # Search the best move of this depth first on the next one
+                moves.remove(best_move)
+                moves.insert(0, best_move)
+                if abs(best_score) >= WIN_SCORE:
+                    break
+        except SearchTimeout:
+            pass
+        finally:
+            self.deadline = None
+
+        return best_score, best_move
+
+    # Returns the move the AI wants to play, a multi-jump goes from its first to its last square
+    def get_move(self, board):
+        score, move = self.search(board)
+        if move is None:
+            return None
+        return {"position_from": str(move[0]), "position_to": str(move[-1])}
@@ -0,0 +1,62 @@
+# Images and fonts shared by every screen, loaded once
+#
+# Images are converted to the pixel format of the display the first time they
+# are asked for once a display exists, so blitting them never converts pixels
+# again. Scaled copies are cached per size.
+import os
+
+import pygame
+
+IMAGE_DIRECTORY = "images"
+
+
+class AssetManager:
+    # Initilize the manager, nothing is loaded until it is asked for
+    def __init__(self, directory=IMAGE_DIRECTORY):
+        self.directory = directory
+        self.originals = {}
+        self.images = {}
+        self.fonts = {}
+
+    # Returns an image as loaded from disk
+    def get_original(self, name):
+        if name not in self.originals:
+            self.originals[name] = pygame.image.load(os.path.join(self.directory, name))
+        return self.originals[name]
+
+    # Returns an image in the display's pixel format, scaled to size when one is
+    # given. Before the display exists the image is returned unconverted and
+    # isn't cached, so it gets converted once there is a display.
+    def get_image(self, name, size=None):
+        key = (name, size)
+        image = self.images.get(key)
+        if image is not None:
+            return image
+
+        image = self.get_original(name)
+        if size is not None and image.get_size() != tuple(size):
+            image = pygame.transform.smoothscale(image, size)
+        if pygame.display.get_surface() is None:
+            return image
+
+        if image.get_flags() & pygame.SRCALPHA:
+            image = image.convert_alpha()
+        else:
+            image = image.convert()
+        self.images[key] = image
+        return image
+
+    # Returns a system font, None being pygame's default font
+    def get_font(self, name, size):
+        key = (name, size)
+        if key not in self.fonts:
+            self.fonts[key] = pygame.font.SysFont(name, size)
+        return self.fonts[key]
+
+    # Drops the converted images, to be called when the display mode changes
+    def clear(self):
+        self.images = {}
+
+
+# The manager every screen shares
+ASSETS = AssetManager()
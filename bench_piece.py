@@ -0,0 +1,69 @@
+# Micro-benchmark of the Piece calls made on the hot paths of the game
+import sys
+import timeit
+
+from board import Board
+from piece import Piece
+
+
+def opening_board():
+    pieces = [Piece(str(position) + 'BN') for position in range(0, 12)]
+    pieces += [Piece(str(position) + 'WN') for position in range(20, 32)]
+    return Board(pieces, 'W')
+
+
+# Board reads squares through get_square, older pieces only had get_position
+if hasattr(Piece, "get_square"):
+    def bench_square(piece):
+        return piece.get_square()
+else:
+    def bench_square(piece):
+        return int(piece.get_position())
+
+
+def bench_get_position(piece):
+    return int(piece.get_position())
+
+
+def bench_getters(piece):
+    return piece.get_color(), piece.is_king(), piece.get_has_eaten()
+
+
+def bench_set_position(piece):
+    piece.set_position(17)
+    piece.set_position(18)
+
+
+def bench_get_moves(piece, board):
+    return piece.get_moves(board)
+
+
+def bench_make_unmake(board):
+    board.unmake_move(board.make_move((21, 17)))
+
+
+def bench_build_board():
+    return opening_board()
+
+
+# Runs every benchmark and prints the cost of one call in nanoseconds
+def main(number=200000):
+    board = opening_board()
+    piece = Piece('18WN')
+    cases = [
+        ("square lookup", lambda: bench_square(piece), number),
+        ("int(get_position())", lambda: bench_get_position(piece), number),
+        ("get_color/is_king/get_has_eaten", lambda: bench_getters(piece), number),
+        ("set_position x2", lambda: bench_set_position(piece), number),
+        ("get_moves (opening)", lambda: bench_get_moves(board.get_piece_at(21), board), number // 10),
+        ("make_move + unmake_move", lambda: bench_make_unmake(board), number // 10),
+        ("build opening Board", bench_build_board, number // 100),
+    ]
+    for name, call, count in cases:
+        best = min(timeit.repeat(call, number=count, repeat=5))
+        print(f"{name:34s} {best / count * 1e9:10.1f} ns/call")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+# Frame-time benchmark of the board drawing, with the images as loaded from
+# disk and with the images converted to the display's pixel format
+import argparse
+import os
+import sys
+import time
+
+import pygame
+
+from assets import AssetManager, IMAGE_DIRECTORY
+from board import Board, get_starting_pieces
+from board_gui import (BOARD_IMAGE, BOARD_POSITION, MOVE_MARK_IMAGE, SQUARE_RECTS, BLACK_PIECE_IMAGE,
+                       WHITE_PIECE_IMAGE)
+
+WINDOW_SIZE = (700, 500)
+
+
+# Draws one full frame: the board, every piece and four move marks
+def draw_frame(surface, images, board):
+    surface.fill((0, 0, 0))
+    surface.blit(images[BOARD_IMAGE], BOARD_POSITION)
+    for square in (16, 17, 18, 19):
+        surface.blit(images[MOVE_MARK_IMAGE], SQUARE_RECTS[square])
+    for piece in board.get_pieces():
+        image = images[BLACK_PIECE_IMAGE if piece.get_color() == 'B' else WHITE_PIECE_IMAGE]
+        surface.blit(image, SQUARE_RECTS[piece.get_square()])
+
+
+# Returns the mean time of a frame in seconds
+def time_frames(surface, images, board, frames):
+    start = time.perf_counter()
+    for _ in range(frames):
+        draw_frame(surface, images, board)
+    return (time.perf_counter() - start) / frames
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Time board frames with raw and converted images.")
+    parser.add_argument("--frames", type=int, default=500)
+    parser.add_argument("--images", default=IMAGE_DIRECTORY)
+    parser.add_argument("--headless", action="store_true", help="use SDL's dummy video driver")
+    args = parser.parse_args(argv)
+
+    if args.headless:
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+    pygame.init()
+    surface = pygame.display.set_mode(WINDOW_SIZE)
+    board = Board(get_starting_pieces(), 'W')
+    names = [BOARD_IMAGE, MOVE_MARK_IMAGE, BLACK_PIECE_IMAGE, WHITE_PIECE_IMAGE]
+
+    assets = AssetManager(args.images)
+    raw = {name: assets.get_original(name) for name in names}
+    start = time.perf_counter()
+    converted = {name: assets.get_image(name) for name in names}
+    conversion = time.perf_counter() - start
+
+    raw_frame = time_frames(surface, raw, board, args.frames)
+    converted_frame = time_frames(surface, converted, board, args.frames)
+    print(f"one-time conversion: {conversion * 1000:.3f} ms")
+    print(f"raw images:       {raw_frame * 1000:.3f} ms per frame")
+    print(f"converted images: {converted_frame * 1000:.3f} ms per frame "
+          f"({raw_frame / converted_frame:.2f}x faster)")
+    pygame.quit()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
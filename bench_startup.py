@@ -0,0 +1,50 @@
+# Cold start benchmark: imports modules in fresh interpreters and reports how
+# long the import took and which heavy dependencies it pulled in
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+DEFAULT_MODULES = ["main", "board", "ai"]
+
+# Modules worth knowing about when they get imported
+WATCHED = ["pygame", "numpy", "mysql", "bcrypt", "checkers", "game_control", "board_gui", "ai"]
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps([elapsed, [name for name in {watched!r} if name in sys.modules]]))
+"""
+
+
+# Imports a module in a new interpreter, returns (seconds, watched modules loaded)
+def time_import(module, directory="."):
+    environment = dict(os.environ, SDL_VIDEODRIVER="dummy", PYGAME_HIDE_SUPPORT_PROMPT="1")
+    output = subprocess.run([sys.executable, "-c", _PROBE.format(module=module, watched=WATCHED)],
+                            cwd=directory, env=environment, capture_output=True, text=True, check=True)
+    elapsed, loaded = json.loads(output.stdout.strip().splitlines()[-1])
+    return elapsed, loaded
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Time cold imports of the game's modules.")
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    for module in args.modules:
+        times = []
+        for _ in range(args.runs):
+            elapsed, loaded = time_import(module)
+            times.append(elapsed)
+        print(f"import {module:12s} median {statistics.median(times) * 1000:7.1f} ms  "
+              f"min {min(times) * 1000:7.1f} ms  loads: {', '.join(loaded) or 'nothing watched'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,130 +1,332 @@
 # Board class
-from utils import get_position_with_row_col
+from geometry import (ROW, COLUMN, SQUARE_AT, NEIGHBORS, JUMPS, JUMPED, SHIFTS, JUMP_DISTANCE,
+                      UP_DIRECTIONS, DOWN_DIRECTIONS, ALL_DIRECTIONS, PROMOTION_ROW, FULL_MASK,
+                      shift_mask, iter_squares)
+from piece import Piece
+from zobrist import piece_key, BLACK_TO_MOVE_KEY
+
+
+# Returns the pieces of a new game, black on the top three rows and white on the bottom three
+def get_starting_pieces():
+    pieces = []
+
+    for opponent_piece in range(0, 12):
+        pieces.append(Piece(str(opponent_piece) + 'BN'))
+
+    for player_piece in range(20, 32):
+        pieces.append(Piece(str(player_piece) + 'WN'))
+
+    return pieces
 
 
 class Board:
-    # Initilize the pieces and their color
-    def __init__(self, pieces, color_up):
-        self.pieces = pieces
+    # Initilize the pieces, their color and the side to move
+    def __init__(self, pieces, color_up, turn=None):
         self.color_up = color_up
-    
+        self.turn = color_up if turn is None else turn
+        self.squares = [None] * 32
+        self.white = 0
+        self.black = 0
+        self.kings = 0
+        self.pieces = None
+        self.hash = BLACK_TO_MOVE_KEY if self.turn == 'B' else 0
+
+        for piece in pieces:
+            self.place_piece(piece)
+
     # Return the color
     def get_color_up(self):
         return self.color_up
 
-    # Return the pieces on the board
+    # Return the color to move
+    def get_turn(self):
+        return self.turn
+
+    # Change the color to move
+    def set_turn(self, color):
+        if color != self.turn:
+            self.hash ^= BLACK_TO_MOVE_KEY
+            self.turn = color
+
+    # Return the Zobrist hash of the position and the side to move
+    def get_hash(self):
+        return self.hash
+
+    # Return the pieces on the board, ordered by square
     def get_pieces(self):
+        if self.pieces is None:
+            self.pieces = [piece for piece in self.squares if piece is not None]
         return self.pieces
 
     # Returns the piece by its index
     def get_piece_by_index(self, index):
-        return self.pieces[index]
+        return self.get_pieces()[index]
+
+    # Returns the piece standing on a square, or None
+    def get_piece_at(self, position):
+        return self.squares[position]
+
+    # Returns the bitmask of every piece of a color
+    def get_color_mask(self, color):
+        return self.white if color == 'W' else self.black
+
+    # Returns the bitmask of every occupied square
+    def get_occupied_mask(self):
+        return self.white | self.black
+
+    # Returns the bitmask of the kings
+    def get_king_mask(self):
+        return self.kings
+
+    # Puts a piece on its square and updates the masks
+    def place_piece(self, piece):
+        position = piece.get_square()
+        bit = 1 << position
+        if piece.get_color() == 'W':
+            self.white |= bit
+        else:
+            self.black |= bit
+        if piece.is_king():
+            self.kings |= bit
+        self.hash ^= piece_key(piece.get_color(), piece.is_king(), position)
+        self.squares[position] = piece
+        self.pieces = None
+
+    # Takes the piece off a square and clears its bit from the masks
+    def remove_piece(self, position):
+        clear = FULL_MASK ^ (1 << position)
+        self.white &= clear
+        self.black &= clear
+        self.kings &= clear
+        piece = self.squares[position]
+        if piece is not None:
+            self.hash ^= piece_key(piece.get_color(), piece.is_king(), position)
+        self.squares[position] = None
+        self.pieces = None
+        return piece
 
     def has_piece(self, position):
-        string_pos = str(position)
-        for piece in self.pieces:
-            if piece.get_position() == string_pos:
-                return True
-        return False
+        return ((self.white | self.black) >> position) & 1 == 1
 
     # Returns the row number
     def get_row_number(self, position):
-        return position // 4
+        return ROW[position]
 
     # Returns the column number
     def get_col_number(self, position):
-        remainder = position % 4
-        column_position = remainder * 2
-        if (self.get_row_number(position)) % 2 == 0:
-            return column_position
-        return column_position + 1
+        return COLUMN[position]
 
     # Return row of a piece
     def get_row(self, row_number):
-        row_pos = [0, 1, 2, 3]
-        row_pos = list(map((lambda pos: str(pos + (4 * row_number))), row_pos))
-        row = []
-
-        for piece in self.pieces:
-            if piece.get_position() in row_pos:
-                row.append(piece)
-
-        return set(row)
+        start = row_number * 4
+        return {piece for piece in self.squares[start:start + 4] if piece is not None}
 
     # Returns a piece based on position on the board
     def get_pieces_by_coords(self, *coords):
-        row_memory = dict()
         results = []
-
-        for coord in coords:
-            if coord[0] in row_memory:
-                row = row_memory[coord[0]]
-            else:
-                row = self.get_row(coord[0])
-                row_memory[coord[0]] = row
-
-            for piece in row:
-                if self.get_col_number(int(piece.get_position())) == coord[1]:
-                    results.append(piece)
-                    break
+        for row, column in coords:
+            # Only the dark squares of the board hold pieces
+            if 0 <= row < 8 and 0 <= column < 8 and SQUARE_AT[row][column] != -1:
+                results.append(self.squares[SQUARE_AT[row][column]])
             else:
                 results.append(None)
         return results
 
+    # Returns an independent copy of the board and its pieces
+    def copy(self):
+        return Board([piece.copy() for piece in self.get_pieces()], self.color_up, self.turn)
+
     # Moves the pieces on the board
     def move_piece(self, move_index, new_pos):
-        def is_eat_movement(pos):
-            return abs(self.get_row_number(pos) - self.get_row_number(new_pos)) != 1
-    
-        # Force the player to eat opponent piece
-        def get_eaten_index(pos):
-            coords = [self.get_row_number(pos), self.get_col_number(pos)]
-            new_coords = [self.get_row_number(new_pos), self.get_col_number(new_pos)]
-            eat_coords = [coords[0], coords[1]]
-
-            eat_coords[0] += (new_coords[0] - coords[0]) // 2
-            eat_coords[1] += (new_coords[1] - coords[1]) // 2
-
-            eaten_pos = str(get_position_with_row_col(eat_coords[0], eat_coords[1]))
-
-            for index, piece in enumerate(self.pieces):
-                if piece.get_position() == eaten_pos:
-                    return index
-    
-        # Allow King pieces to move backwards
-        def is_king_movement(piece):
-            if piece.is_king():
-                return False
-
-            row = self.get_row_number(new_pos)
-            color = piece.get_color()
-            if self.color_up == color:
-                king_row = 0
-            else:
-                king_row = 7
+        self.move_piece_at(self.get_piece_by_index(move_index).get_square(), new_pos)
+
+    # Moves the piece standing on a square, the turn passes unless the piece can keep jumping
+    # (crowning a piece always ends the turn)
+    def move_piece_at(self, old_pos, new_pos):
+        self.make_move((old_pos, new_pos))
 
-            return row == king_row
+    # Plays a move given as the path of squares visited by the piece and
+    # returns a token that unmake_move uses to take it back
+    def make_move(self, move):
+        position_from = move[0]
+        position_to = move[-1]
+        piece = self.squares[position_from]
+        color = piece.get_color()
+        was_king = piece.is_king()
+        token = (move, piece, was_king, piece.get_has_eaten(),
+                 self.white, self.black, self.kings, self.hash, self.turn, [])
 
-        piece_to_move = self.pieces[move_index]
+        # Eats every piece jumped over along the path
+        captured = token[-1]
+        captured_mask = 0
+        for index in range(len(move) - 1):
+            eaten_pos = JUMPED[move[index]][move[index + 1]]
+            if eaten_pos != -1:
+                eaten = self.squares[eaten_pos]
+                captured.append((eaten_pos, eaten))
+                captured_mask |= 1 << eaten_pos
+                self.hash ^= piece_key(eaten.get_color(), eaten.is_king(), eaten_pos)
+                self.squares[eaten_pos] = None
 
-        # Eats a piece and removes it from the board
-        if is_eat_movement(int(piece_to_move.get_position())):
-            self.pieces.pop(get_eaten_index(int(piece_to_move.get_position())))
-            piece_to_move.set_has_eaten(True)
+        # A piece reaching the far row becomes a king
+        is_king = was_king or ROW[position_to] == PROMOTION_ROW[self.color_up == color]
+
+        from_bit = 1 << position_from
+        to_bit = 1 << position_to
+        keep = FULL_MASK ^ (from_bit | captured_mask)
+        if color == 'W':
+            self.white = (self.white & keep) | to_bit
+            self.black &= keep
+        else:
+            self.black = (self.black & keep) | to_bit
+            self.white &= keep
+        self.kings &= keep
+        if is_king:
+            self.kings |= to_bit
+        self.hash ^= piece_key(color, was_king, position_from) ^ piece_key(color, is_king, position_to)
+
+        self.squares[position_from] = None
+        self.squares[position_to] = piece
+        self.pieces = None
+        piece.set_position(position_to)
+        if is_king != was_king:
+            piece.set_is_king(True)
+        piece.set_has_eaten(len(captured) != 0)
+
+        if len(captured) == 0 or is_king != was_king or not self.has_capture_from(position_to):
+            self.set_turn('B' if color == 'W' else 'W')
+        return token
+
+    # Takes back a move played by make_move
+    def unmake_move(self, token):
+        move, piece, was_king, had_eaten, self.white, self.black, self.kings, self.hash, self.turn, captured = token
+        self.squares[move[-1]] = None
+        self.squares[move[0]] = piece
+        for eaten_pos, eaten in captured:
+            self.squares[eaten_pos] = eaten
+        self.pieces = None
+        piece.set_position(move[0])
+        piece.set_is_king(was_king)
+        piece.set_has_eaten(had_eaten)
+
+    # Returns whether the piece on a square can jump an opponent piece
+    def has_capture_from(self, position):
+        bit = 1 << position
+        if self.white & bit:
+            color, opponent = 'W', self.black
+        else:
+            color, opponent = 'B', self.white
+        occupied = self.white | self.black
+
+        if self.kings & bit:
+            directions = ALL_DIRECTIONS
+        elif color == self.color_up:
+            directions = UP_DIRECTIONS
+        else:
+            directions = DOWN_DIRECTIONS
+        for direction in directions:
+            landing = JUMPS[direction][position]
+            if landing != -1 and (opponent >> NEIGHBORS[direction][position]) & 1 and not (occupied >> landing) & 1:
+                return True
+        return False
+
+    # Returns every quiet move and capture of a color as (from, to) pairs,
+    # together with whether the color is forced to eat
+    def generate_moves(self, color):
+        if color == 'W':
+            own, opponent = self.white, self.black
+        else:
+            own, opponent = self.black, self.white
+        empty = FULL_MASK ^ (own | opponent)
+
+        if color == self.color_up:
+            directions = ((own, UP_DIRECTIONS), (own & self.kings, DOWN_DIRECTIONS))
         else:
-            piece_to_move.set_has_eaten(False)
+            directions = ((own, DOWN_DIRECTIONS), (own & self.kings, UP_DIRECTIONS))
+
+        quiet = []
+        captures = []
+        for movers, group in directions:
+            if not movers:
+                continue
+            for direction in group:
+                landing = shift_mask(shift_mask(movers, direction) & opponent, direction) & empty
+                for target in iter_squares(landing):
+                    captures.append((target - JUMP_DISTANCE[direction], target))
 
-        if is_king_movement(piece_to_move):
-            piece_to_move.set_is_king(True)
+                for source, shift in SHIFTS[direction]:
+                    if shift < 0:
+                        targets = (movers & source) >> -shift
+                    else:
+                        targets = ((movers & source) << shift) & FULL_MASK
+                    for target in iter_squares(targets & empty):
+                        quiet.append((target - shift, target))
 
-        piece_to_move.set_position(new_pos)
+        return {"quiet": quiet, "captures": captures, "must_eat": len(captures) != 0}
+
+    # Returns every legal move of a color as the path of squares the piece
+    # visits. Captures are complete jump sequences, as eating is mandatory
+    # a piece keeps jumping until it can't or until it is crowned.
+    def get_legal_moves(self, color):
+        side_moves = self.generate_moves(color)
+        if not side_moves["must_eat"]:
+            return side_moves["quiet"]
+
+        if color == 'W':
+            own, opponent = self.white, self.black
+        else:
+            own, opponent = self.black, self.white
+        king_row = PROMOTION_ROW[color == self.color_up]
+
+        sequences = []
+        started = set()
+        for position_from, _ in side_moves["captures"]:
+            if position_from in started:
+                continue
+            started.add(position_from)
+
+            bit = 1 << position_from
+            if self.kings & bit:
+                directions = ALL_DIRECTIONS
+            elif color == self.color_up:
+                directions = UP_DIRECTIONS
+            else:
+                directions = DOWN_DIRECTIONS
+            # The jumping piece leaves its square, so it may pass over it again
+            empty = FULL_MASK ^ (own | opponent) | bit
+            self.extend_jumps((position_from,), opponent, empty, directions,
+                              -1 if self.kings & bit else king_row, sequences)
+        return sequences
+
+    # Depth-first search over the jumps available from the last square of a path,
+    # working on masks only so the board itself is never touched
+    def extend_jumps(self, path, opponent, empty, directions, king_row, sequences):
+        position = path[-1]
+        extended = False
+        for direction in directions:
+            landing = JUMPS[direction][position]
+            if landing == -1 or not (empty >> landing) & 1:
+                continue
+            eaten_bit = 1 << NEIGHBORS[direction][position]
+            if not opponent & eaten_bit:
+                continue
+
+            extended = True
+            new_path = path + (landing,)
+            if ROW[landing] == king_row:
+                sequences.append(new_path)
+            else:
+                self.extend_jumps(new_path, opponent ^ eaten_bit,
+                                  (empty ^ (1 << landing)) | (1 << position) | eaten_bit,
+                                  directions, king_row, sequences)
+
+        if not extended:
+            sequences.append(path)
 
     # Returns winner once all pieces are eaten
     def get_winner(self):
-        color = self.pieces[0].get_color()
-        for piece in self.pieces:
-            if piece.get_color() != color:
-                break
-        else:
-            return color
-        return None
\ No newline at end of file
+        if self.white and not self.black:
+            return 'W'
+        if self.black and not self.white:
+            return 'B'
+        return None
@@ -1,116 +1,180 @@
-from utils import get_piece_gui_coords, get_piece_position
+from assets import ASSETS
+from geometry import ROW, COLUMN, SQUARE_AT
+from utils import get_piece_gui_coords, get_row_col_at
 import pygame
 
-# Preload images
-BLACK_PIECE_SURFACE = pygame.image.load("images/black_piece.png")
-WHITE_PIECE_SURFACE = pygame.image.load("images/white_piece.png")
-BOARD = pygame.image.load("images/board.png")
-BLACK_KING_PIECE_SURFACE = pygame.image.load("images/black_king_piece.png")
-WHITE_KING_PIECE_SURFACE = pygame.image.load("images/white_king_piece.png")
-MOVE_MARK = pygame.image.load("images/marking.png")
+# Images, loaded and converted by the shared asset manager
+BLACK_PIECE_IMAGE = "black_piece.png"
+WHITE_PIECE_IMAGE = "white_piece.png"
+BOARD_IMAGE = "board.png"
+BLACK_KING_PIECE_IMAGE = "black_king_piece.png"
+WHITE_KING_PIECE_IMAGE = "white_king_piece.png"
+MOVE_MARK_IMAGE = "marking.png"
 
 BOARD_POSITION = (26, 26)
+# Color of the window around the board
+BACKGROUND_COLOR = (0, 0, 0)
 TOPLEFTBORDER = (34, 34)
 SQUARE_DIST = 56
 
+# Top left corner of every square on the screen
+SQUARE_COORDS = tuple(get_piece_gui_coords((ROW[square], COLUMN[square]), SQUARE_DIST, TOPLEFTBORDER)
+                      for square in range(32))
+SQUARE_RECTS = tuple(pygame.Rect(coords, (41, 41)) for coords in SQUARE_COORDS)
+
+# Returns the dark square under a point of the screen, or -1 off the board and on light squares
+def get_square_at(pixel):
+    row, column = get_row_col_at(pixel, SQUARE_DIST, BOARD_POSITION)
+    if 0 <= row < 8 and 0 <= column < 8:
+        return SQUARE_AT[row][column]
+    return -1
+
 # Class for the Board GUI
 class BoardGUI:
-    # Initilize the pieces, board, and move marks
+    # Initilize the pieces, board, and move marks. The whole board starts out
+    # dirty, after that only the areas that change are drawn again.
     def __init__(self, board):
         self.pieces = self.get_piece_properties(board)
-        self.hidden_piece = -1
-        self.move_marks = []
-
-    def set_pieces(self, piece_list):
-        self.pieces = piece_list
-
-    # Creates a dictionary tracking every piece
+        self.hidden_piece = None
+        self.move_marks = {}
+        self.board_rect = ASSETS.get_original(BOARD_IMAGE).get_rect(topleft=BOARD_POSITION)
+        self.dirty_rects = [self.board_rect.copy()]
+
+    # Replace all the pieces, the squares whose piece changed are redrawn
+    def set_pieces(self, pieces):
+        for square in set(self.pieces) | set(pieces):
+            old = self.pieces.get(square)
+            new = pieces.get(square)
+            if old is None or new is None or (old["color"], old["is_king"]) != (new["color"], new["is_king"]):
+                self.mark_dirty(SQUARE_RECTS[square])
+        self.pieces = pieces
+
+    # Patches the pieces after a move: the piece goes from one square to
+    # another, the pieces on the captured squares are removed and is_king
+    # tells whether the piece is a king once it arrived
+    def apply_move(self, position_from, position_to, captured=(), is_king=False):
+        piece = self.pieces.pop(position_from)
+        piece["rect"] = SQUARE_RECTS[position_to].copy()
+        piece["is_king"] = is_king
+        self.pieces[position_to] = piece
+        self.mark_dirty(SQUARE_RECTS[position_from])
+        self.mark_dirty(SQUARE_RECTS[position_to])
+        for square in captured:
+            del self.pieces[square]
+            self.mark_dirty(SQUARE_RECTS[square])
+
+    # Adds an area of the screen to redraw on the next draw_dirty, it may reach
+    # past the board, e.g. where a held piece was dragged
+    def mark_dirty(self, rect):
+        self.dirty_rects.append(rect.copy())
+
+    # Redraws the areas that changed since the last call and returns them, for
+    # pygame.display.update. Off the board they are cleared to the background.
+    # A held piece is drawn over them where it overlaps.
+    def draw_dirty(self, display_surface, held_piece=None):
+        screen_rect = display_surface.get_rect()
+        rects = [rect.clip(screen_rect) for rect in self.dirty_rects]
+        rects = [rect for rect in rects if rect.width and rect.height]
+        self.dirty_rects = []
+        for rect in rects:
+            display_surface.set_clip(rect)
+            if not self.board_rect.contains(rect):
+                display_surface.fill(BACKGROUND_COLOR, rect)
+            display_surface.blit(ASSETS.get_image(BOARD_IMAGE), BOARD_POSITION)
+            for mark in self.move_marks.values():
+                if mark.colliderect(rect):
+                    display_surface.blit(ASSETS.get_image(MOVE_MARK_IMAGE), mark)
+            for square, piece in self.pieces.items():
+                if square != self.hidden_piece and piece["rect"].colliderect(rect):
+                    display_surface.blit(self.get_piece_surface(piece), piece["rect"])
+            if held_piece is not None and held_piece.get_rect().colliderect(rect):
+                display_surface.blit(held_piece.get_surface(), held_piece.get_rect())
+        display_surface.set_clip(None)
+        return rects
+
+    # Creates a dictionary tracking every piece, keyed by square
     def get_piece_properties(self, board):
-        initial_pieces = board.get_pieces()
-        pieces = []
-        for piece in initial_pieces:
-            piece_position = int(piece.get_position())
-            piece_row = board.get_row_number(piece_position)
-            piece_column = board.get_col_number(piece_position)
+        pieces = dict()
+        for piece in board.get_pieces():
             piece_properties = dict()
 
-            piece_properties["rect"] = pygame.Rect(
-                get_piece_gui_coords((piece_row, piece_column), SQUARE_DIST, TOPLEFTBORDER), (41, 41))
+            piece_properties["rect"] = SQUARE_RECTS[piece.get_square()].copy()
             piece_properties["color"] = piece.get_color()
             piece_properties["is_king"] = piece.is_king()
-            pieces.append(piece_properties)
+            pieces[piece.get_square()] = piece_properties
         return pieces
 
-    # Returns a piece by its index
-    def get_piece_by_index(self, index):
-        return self.pieces[index]
+    # Returns the piece on a square
+    def get_piece_at(self, square):
+        return self.pieces[square]
 
     # Return if a piece must be hidden
-    def hide_piece(self, index):
-        self.hidden_piece = index
+    def hide_piece(self, square):
+        self.hidden_piece = square
+        self.mark_dirty(SQUARE_RECTS[square])
  
     def show_piece(self):
         piece_shown = self.hidden_piece
-        self.hidden_piece = -1
+        self.hidden_piece = None
+        if piece_shown is not None:
+            self.mark_dirty(SQUARE_RECTS[piece_shown])
         return piece_shown
 
+    # Return the image of a piece from its properties
+    def get_piece_surface(self, piece):
+        if piece['is_king']:
+            return ASSETS.get_image(BLACK_KING_PIECE_IMAGE if piece["color"] == "B" else WHITE_KING_PIECE_IMAGE)
+        return ASSETS.get_image(BLACK_PIECE_IMAGE if piece["color"] == "B" else WHITE_PIECE_IMAGE)
+
     # Draw Pieces on the board
     def draw_pieces(self, display_surface):
-        for index, piece in enumerate(self.pieces):
-            if index == self.hidden_piece:
+        for square, piece in self.pieces.items():
+            if square == self.hidden_piece:
                 continue
-            if piece['is_king']:
-                display_surface.blit(BLACK_KING_PIECE_SURFACE if piece["color"] == "B" else WHITE_KING_PIECE_SURFACE,
-                                     piece["rect"])
-            else:
-                display_surface.blit(BLACK_PIECE_SURFACE if piece["color"] == "B" else WHITE_PIECE_SURFACE,
-                                     piece["rect"])
+            display_surface.blit(self.get_piece_surface(piece), piece["rect"])
 
     # Draw Board
     def draw_board(self, display_surface):
-        display_surface.blit(BOARD, BOARD_POSITION)
+        display_surface.blit(ASSETS.get_image(BOARD_IMAGE), BOARD_POSITION)
 
         if (len(self.move_marks) != 0):
-            for rect in self.move_marks:
-                display_surface.blit(MOVE_MARK, rect)
+            for rect in self.move_marks.values():
+                display_surface.blit(ASSETS.get_image(MOVE_MARK_IMAGE), rect)
 
     # Return the png of a piece, dependent on the ID of the piece
     def get_surface(self, piece):
-        surfaces = [BLACK_PIECE_SURFACE, WHITE_PIECE_SURFACE, BLACK_KING_PIECE_SURFACE, WHITE_KING_PIECE_SURFACE]
+        surfaces = [BLACK_PIECE_IMAGE, WHITE_PIECE_IMAGE, BLACK_KING_PIECE_IMAGE, WHITE_KING_PIECE_IMAGE]
         if piece.is_king():
             surfaces = surfaces[2:]
         else:
             surfaces = surfaces[:2]
         if piece.get_color() == 'B':
-            return surfaces[0]
+            return ASSETS.get_image(surfaces[0])
         else:
-            return surfaces[1]
-
-    # To make the piece follow the mouse when rect
-    def get_position_by_rect(self, rect):
-        return get_piece_position((rect.x, rect.y), SQUARE_DIST, TOPLEFTBORDER)
+            return ASSETS.get_image(surfaces[1])
 
-    # Returns an array containing possible moves of a piece
+    # Returns the move marks of a piece, keyed by square
     def get_move_marks(self):
         return self.move_marks
 
-    # Display potential move marks on the GUI
-    def set_move_marks(self, pos_list):
-        if len(pos_list) == 0:
-            self.move_marks = []
+    # Display potential move marks on the GUI, on the given squares
+    def set_move_marks(self, squares):
+        for rect in self.move_marks.values():
+            self.mark_dirty(rect)
+        if len(squares) == 0:
+            self.move_marks = {}
             return
-        self.move_marks = []
-        for row, column in pos_list:
-            self.move_marks.append(
-                pygame.Rect(
-                    get_piece_gui_coords((row, column), SQUARE_DIST, TOPLEFTBORDER),
-                    (44, 44) 
-                )
-            )
-
-    # Select the piece which the mouse is interacting with
+        self.move_marks = {}
+        for square in squares:
+            self.move_marks[square] = pygame.Rect(SQUARE_COORDS[square], (44, 44))
+            self.mark_dirty(self.move_marks[square])
+
+    # Returns the marked square a held piece is dropped on, the one under its center, or None
+    def get_drop_square(self, rect):
+        square = get_square_at(rect.center)
+        return square if square in self.move_marks else None
+
+    # Returns the square of the piece which the mouse is interacting with, or None
     def get_piece_on_mouse(self, mouse_pos):
-        for index, piece in enumerate(self.pieces):
-            if piece["rect"].collidepoint(mouse_pos):
-                return {"index": index, "piece": piece}
-        return None
+        square = get_square_at(mouse_pos)
+        return square if square in self.pieces else None
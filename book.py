@@ -0,0 +1,150 @@
+# Opening book stored as a sorted file of fixed-size records, read through mmap
+#
+# The file starts with a 16 byte header (magic, record count) followed by one
+# record per (position, move): the position's Zobrist hash, the first and last
+# square of the move, and how many games played it, won and drew with it.
+# Records are sorted by hash so a lookup is a binary search over the mapped
+# pages; opening the book costs the same whatever its size, and processes
+# opening the same file share its pages.
+import argparse
+import json
+import mmap
+import struct
+import sys
+from collections import defaultdict
+
+from board import Board, get_starting_pieces
+
+
+MAGIC = b"CKBOOK1\0"
+HEADER = struct.Struct("<8sII")
+RECORD = struct.Struct("<QBBHHH")
+
+DEFAULT_BOOK = "book.bin"
+DEFAULT_MAX_PLIES = 16
+DEFAULT_MIN_PLAYS = 2
+
+
+# Returns the games of a JSONL game log, as written by selfplay.py
+def read_games(path):
+    with open(path) as log:
+        for line in log:
+            line = line.strip()
+            if line:
+                game = json.loads(line)
+                yield [tuple(move) for move in game["moves"]], game["result"]
+
+
+# Replays games and writes the moves played in their first plies to a book file,
+# returns how many records were written
+def build_book(games, output=DEFAULT_BOOK, max_plies=DEFAULT_MAX_PLIES, min_plays=DEFAULT_MIN_PLAYS):
+    stats = defaultdict(lambda: [0, 0, 0])
+    for moves, result in games:
+        board = Board(get_starting_pieces(), 'W')
+        for move in moves[:max_plies]:
+            color = board.get_turn()
+            entry = stats[(board.get_hash(), move[0], move[-1])]
+            entry[0] += 1
+            if result == color:
+                entry[1] += 1
+            elif result == "draw":
+                entry[2] += 1
+            board.make_move(move)
+
+    # Counts are stored on 16 bits, larger ones are scaled down together
+    records = []
+    for (key, position_from, position_to), (plays, wins, draws) in stats.items():
+        if plays < min_plays:
+            continue
+        scale = max(1, -(-plays // 0xFFFF))
+        records.append((key, position_from, position_to, plays // scale, wins // scale, draws // scale))
+    records.sort()
+
+    with open(output, "wb") as book_file:
+        book_file.write(HEADER.pack(MAGIC, len(records), 0))
+        for record in records:
+            book_file.write(RECORD.pack(*record))
+    return len(records)
+
+
+class OpeningBook:
+    # Maps the book file into memory, nothing else is read until a lookup
+    def __init__(self, path=DEFAULT_BOOK):
+        self.path = path
+        with open(path, "rb") as book_file:
+            self.data = mmap.mmap(book_file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count, _ = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC:
+            self.data.close()
+            raise ValueError(f"{path} is not an opening book")
+
+    # Returns the record at an index
+    def get_record(self, index):
+        return RECORD.unpack_from(self.data, HEADER.size + index * RECORD.size)
+
+    # Returns every (first square, last square, plays, wins, draws) stored for a position
+    def probe(self, key):
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if RECORD.unpack_from(self.data, HEADER.size + middle * RECORD.size)[0] < key:
+                low = middle + 1
+            else:
+                high = middle
+
+        entries = []
+        while low < self.count:
+            record = self.get_record(low)
+            if record[0] != key:
+                break
+            entries.append(record[1:])
+            low += 1
+        return entries
+
+    # Returns the legal move the book prefers for the side to move, or None when out of book.
+    # Moves are ranked by their score over the games that played them, or drawn at
+    # random in proportion to how often they were played when a generator is given.
+    def get_move(self, board, generator=None):
+        entries = self.probe(board.get_hash())
+        if len(entries) == 0:
+            return None
+
+        if generator is not None:
+            position_from, position_to = generator.choices(
+                [entry[:2] for entry in entries], weights=[entry[2] for entry in entries])[0]
+        else:
+            best = max(entries, key=lambda entry: ((entry[3] + entry[4] / 2) / entry[2], entry[2]))
+            position_from, position_to = best[:2]
+
+        for move in board.get_legal_moves(board.get_turn()):
+            if move[0] == position_from and move[-1] == position_to:
+                return move
+        return None
+
+    # Unmaps the book file
+    def close(self):
+        self.data.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Build an opening book from game logs.")
+    parser.add_argument("logs", nargs="+", help="JSONL game logs, e.g. written by selfplay.py")
+    parser.add_argument("--output", default=DEFAULT_BOOK)
+    parser.add_argument("--max-plies", type=int, default=DEFAULT_MAX_PLIES)
+    parser.add_argument("--min-plays", type=int, default=DEFAULT_MIN_PLAYS)
+    args = parser.parse_args(argv)
+
+    games = (game for path in args.logs for game in read_games(path))
+    count = build_book(games, args.output, args.max_plies, args.min_plays)
+    print(f"wrote {count} book moves to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
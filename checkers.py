@@ -1,8 +1,14 @@
 import pygame as pg
+from ai import AI, get_weights_file
+from assets import ASSETS
+from board_gui import BACKGROUND_COLOR
 from game_control import GameControl
+from user_manager import get_record_writer
 
 
-def main():
+# Plays against the computer on ai_color, or two players share the board when it is None.
+# The result of a game against the computer is recorded for username when one is given.
+def main(ai_color=None, username=None):
     FPS = 30
     DISPLAYSURF = pg.display.get_surface()
     if DISPLAYSURF is None:
@@ -12,13 +18,24 @@ def main():
     clock = pg.time.Clock()
 
     # Set player color
-    game_control = GameControl(player_color="W")
+    # The computer plays with the tuned evaluation weights when tuner.py wrote them
+    ai = AI(ai_color, weights=get_weights_file()) if ai_color is not None else None
+    game_control = GameControl(player_color="W", ai=ai)
 
     # Font setup
-    font = pg.font.SysFont("Arial", 25)
+    font = ASSETS.get_font("Arial", 25)
     turn_pos = (509, 26)
+    thinking_pos = (509, 68)
     winner_pos = (509, 152)
 
+    # The window is drawn in full once, after that each frame only draws and
+    # pushes the areas that changed, and an idle frame draws nothing
+    DISPLAYSURF.fill(BACKGROUND_COLOR)
+    game_control.draw_screen(DISPLAYSURF)
+    pg.display.update()
+    status_rect = pg.Rect(turn_pos, (DISPLAYSURF.get_width() - turn_pos[0], winner_pos[1] + 40 - turn_pos[1]))
+    shown_status = None
+
     running = True
     while running:
         for event in pg.event.get():
@@ -31,23 +48,47 @@ def main():
             elif event.type == pg.MOUSEBUTTONUP and event.button == 1:
                 game_control.release_piece()
 
-        DISPLAYSURF.fill((0, 0, 0))
-        game_control.draw_screen(DISPLAYSURF)
+        # The computer searches in the background, this only picks up its move
+        game_control.update()
 
-        turn_text = "White's turn" if game_control.get_turn() == "W" else "Black's turn"
-        DISPLAYSURF.blit(font.render(turn_text, True, (255, 255, 255)), turn_pos)
+        dirty_rects = game_control.draw_changes(DISPLAYSURF)
 
+        turn_text = "White's turn" if game_control.get_turn() == "W" else "Black's turn"
+        thinking_text = None
+        if game_control.is_computer_thinking():
+            depth, nodes = game_control.get_computer_progress()
+            thinking_text = f"Depth {depth}, {nodes} nodes"
         winner = game_control.get_winner()
+        winner_text = None
         if winner is not None:
             winner_text = "White wins!" if winner == "W" else "Black wins!"
-            DISPLAYSURF.blit(font.render(winner_text, True, (255, 255, 255)), winner_pos)
-            pg.display.update()
+
+        # The status is written over the board and a held piece, so it is
+        # written again when a held piece was drawn under it
+        status = (turn_text, thinking_text, winner_text)
+        if status != shown_status or status_rect.collidelist(dirty_rects) != -1:
+            shown_status = status
+            game_control.mark_dirty(status_rect)
+            dirty_rects += game_control.draw_changes(DISPLAYSURF)
+            for text, position in ((turn_text, turn_pos), (thinking_text, thinking_pos), (winner_text, winner_pos)):
+                if text is not None:
+                    DISPLAYSURF.blit(font.render(text, True, (255, 255, 255)), position)
+            dirty_rects.append(status_rect)
+
+        if dirty_rects:
+            pg.display.update(dirty_rects)
+
+        if winner is not None:
+            if username is not None and ai_color is not None:
+                # Only queued here, the writer stores it in the background
+                get_record_writer().submit(username, winner != ai_color)
             pg.time.wait(3000)
             running = False
 
-        pg.display.update()
         clock.tick(FPS)
 
+    game_control.close()
+
 
 
 if __name__ == "__main__":
@@ -2,47 +2,59 @@ from __future__ import annotations
 import os
 import mysql.connector
 from mysql.connector import Error
-import bcrypt
+
+from pool import ConnectionPool, PoolTimeout, DEFAULT_SIZE
+from storage import Storage
+
+# Errors after which a connection is thrown away instead of going back to the pool
+CONNECTION_ERRORS = (mysql.connector.InterfaceError, mysql.connector.OperationalError)
+
+# Times a read is tried again on a fresh connection after its connection dropped
+RETRIES = 1
 
 # A class to access the database
-class Database:
-    def __init__(self):
+class Database(Storage):
+    # Initilize the database, connect() opens a new connection and defaults to
+    # MySQL with the settings from the environment
+    def __init__(self, connect=None, pool_size=None):
         self.config = {
             "host": os.getenv("DB_HOST", "localhost"),
             "user": os.getenv("DB_USER", "root"),
             "password": os.getenv("DB_PASSWORD", "1234"),
             "database": os.getenv("DB_DATABASE", "checkers_db"),
         }
+        if pool_size is None:
+            pool_size = int(os.getenv("DB_POOL_SIZE", DEFAULT_SIZE))
+        self.pool = ConnectionPool(connect or self.connect, pool_size)
 
     # Connect to the locally stored DB
     def connect(self):
-        try:
-            return mysql.connector.connect(**self.config)
-        except mysql.connector.Error as err:
-            print(f"[DB] Connection failed: {err}")
-            return None
+        return mysql.connector.connect(**self.config)
 
+    # Runs work(conn) on a pooled connection and returns its result. When the
+    # connection drops it is thrown away, and idempotent work (reads) is tried
+    # again on a new one. Writes aren't, the server may have committed them.
+    def run(self, work, idempotent=False):
+        retries = RETRIES if idempotent else 0
+        for attempt in range(retries + 1):
+            try:
+                with self.pool.connection(CONNECTION_ERRORS) as conn:
+                    return work(conn)
+            except CONNECTION_ERRORS as err:
+                if attempt == retries:
+                    raise
+                print(f"[DB] Connection lost, reconnecting: {err}")
 
-    @staticmethod
-    # Helper method for encryption
-    def _to_bytes(x) -> bytes:
-        if isinstance(x, (bytes, bytearray)):
-            return bytes(x)
-        return str(x).encode("utf-8")
-
-    @staticmethod
-    # Helper method for encryption
-    def _looks_like_bcrypt(h: bytes) -> bool:
-        return h.startswith(b"$2a$") or h.startswith(b"$2b$") or h.startswith(b"$2y$")
+    # Closes the pooled connections
+    def close(self):
+        self.pool.close()
 
     # Returns user from the database
     def get_user(self, username: str) -> dict | None:
         if not username:
             return None
-        conn = self.connect()
-        if conn is None:
-            return None
-        try:
+
+        def work(conn):
             with conn.cursor(dictionary=True) as cursor:
                 cursor.execute(
                     "SELECT username, salt, hash FROM users WHERE username = %s",
@@ -50,50 +62,32 @@ class Database:
                 )
                 row = cursor.fetchone()
                 return row if row else None
-        except Error as e:
+
+        try:
+            return self.run(work, idempotent=True)
+        except (Error, PoolTimeout) as e:
             print(f"[DB] get_user Error: {e}")
             return None
-        finally:
-            conn.close()
-
-    # Creates a new user and stores it into database
-    def create_user(self, username: str, password: str) -> bool:
-        salt_bytes = bcrypt.gensalt()
-        hash_bytes = bcrypt.hashpw(password.encode("utf-8"), salt_bytes)
-        salt_str = salt_bytes.decode("utf-8")
-        hash_str = hash_bytes.decode("utf-8")
-
-        conn = self.connect()
-        if conn is None:
-            print("Connection failed")
-            return False
-        try:
+
+    # Stores a new user into database
+    def add_user(self, username: str, salt: str, hash: str) -> bool:
+        def work(conn):
             with conn.cursor() as cursor:
                 cursor.execute(
                     "INSERT INTO users (username, salt, hash) VALUES (%s, %s, %s)",
-                    (username, salt_str, hash_str),
+                    (username, salt, hash),
                 )
             conn.commit()
             return True
-        except Error as e:
+
+        try:
+            return self.run(work)
+        except (Error, PoolTimeout) as e:
             print("Failed to create user:", e)
             return False
-        finally:
-            conn.close()
-
-    # Retrieves user and login details from database, and tests if it matches
-    def correct_password(self, username: str, password: str) -> bool:
-        user = self.get_user(username)
-        stored_hash = user.get("hash")
-        stored_hash_b = self._to_bytes(stored_hash)
-        ok = bcrypt.checkpw(password.encode("utf-8"), stored_hash_b)
-        return not ok
-
-    def create_record(self, username: str, win: bool):
-        if conn is None:
-            print("Connection failed")
-            return False
-        try:
+
+    def create_record(self, username: str, win: bool) -> bool:
+        def work(conn):
             with conn.cursor() as cursor:
                 cursor.execute(
                     "INSERT INTO records (username, win) VALUES (%s, %s)",
@@ -101,30 +95,43 @@ class Database:
                 )
             conn.commit()
             return True
-        except Error as e:
+
+        try:
+            return self.run(work)
+        except (Error, PoolTimeout) as e:
             print("Failed to create record:", e)
             return False
-        finally:
-            conn.close()
 
-    def get_record(self, username: str):
-        if conn is None:
-            print("Connection failed")
-            return False
-        try:
+    # Stores many (username, win) results in one transaction
+    def create_records(self, records) -> bool:
+        def work(conn):
             with conn.cursor() as cursor:
-                query = """
-                        SELECT 
-                            ROUND(100.0 * SUM(CASE WHEN win = TRUE THEN 1 ELSE 0 END) / COUNT(*), 2) AS win_percentage
-                        FROM records
-                        WHERE username = %s
-                        """
-                cursor.execute(query, (username,))
-                result = cursor.fetchone()
-                if result and result[0] is not None:
-                    return result[0]
-                else:
-                    return 0.0
-        except Exception as e:
-            print(f"[DB] get_record Error: {e}")
+                cursor.executemany(
+                    "INSERT INTO records (username, win) VALUES (%s, %s)",
+                    [(username, win) for username, win in records]
+                )
+            conn.commit()
+            return True
+
+        try:
+            return self.run(work)
+        except (Error, PoolTimeout) as e:
+            print("Failed to create records:", e)
             return False
+
+    # Returns the games played and won by a user
+    def get_stats(self, username: str) -> dict | None:
+        def work(conn):
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(win), 0) FROM records WHERE username = %s",
+                    (username,),
+                )
+                games, wins = cursor.fetchone()
+                return {"games": int(games), "wins": int(wins), "losses": int(games) - int(wins)}
+
+        try:
+            return self.run(work, idempotent=True)
+        except (Error, PoolTimeout) as e:
+            print(f"[DB] get_stats Error: {e}")
+            return None
@@ -0,0 +1,188 @@
+# Batched position evaluation with NumPy
+#
+# Positions are rows of 32 int8 values, one per dark square: 1 for a white
+# man, 2 for a white king, -1 and -2 for black ones and 0 for an empty square,
+# always laid out so that white moves up the board. Every term is counted for
+# white minus black over a whole batch at once and scores are from white's side.
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+from geometry import SHIFTS, UP_DIRECTIONS, DOWN_DIRECTIONS, ALL_DIRECTIONS, ROW
+
+
+WHITE_MAN = 1
+WHITE_KING = 2
+BLACK_MAN = -1
+BLACK_KING = -2
+
+WIN_SCORE = 1000
+
+# Terms of the evaluation, in the order of a weight vector
+TERMS = ("material", "kings", "advancement", "back_rank", "mobility")
+
+# The default weights only count material, as AI.evaluate does
+DEFAULT_WEIGHTS = {
+    "material": 1.0,
+    "kings": 0.5,
+    "advancement": 0.0,
+    "back_rank": 0.0,
+    "mobility": 0.0,
+}
+
+_BITS = np.arange(32, dtype=np.uint32)
+
+
+# Weight of every (piece kind, square) in the terms that only depend on where
+# pieces stand, piece kinds in the order white man, white king, black man, black king
+def _square_terms():
+    terms = np.zeros((4, 32, 4), dtype=np.float32)
+    for square in range(32):
+        row = ROW[square]
+        terms[0, square] = (1, 0, 7 - row, row == 7)
+        terms[1, square] = (1, 1, 0, 0)
+        terms[2, square] = (-1, 0, -row, -(row == 0))
+        terms[3, square] = (-1, -1, 0, 0)
+    return terms.reshape(128, 4)
+
+
+_SQUARE_TERMS = _square_terms()
+
+
+# Counts the set bits of every mask
+if hasattr(np, "bitwise_count"):
+    def _popcount(masks):
+        return np.bitwise_count(masks).astype(np.int32)
+else:
+    _BYTE_COUNTS = np.array([bin(byte).count("1") for byte in range(256)], dtype=np.int32)
+
+    def _popcount(masks):
+        return _BYTE_COUNTS[masks.view(np.uint8)].reshape(masks.shape + (4,)).sum(axis=-1)
+
+
+# Packs white, black and king masks into position rows, the masks being
+# sequences of equal length. white_up tells whether white moves up the board.
+def encode_masks(white, black, kings, white_up=True):
+    white = (np.asarray(white, dtype=np.uint32)[:, None] >> _BITS) & 1
+    black = (np.asarray(black, dtype=np.uint32)[:, None] >> _BITS) & 1
+    kings = (np.asarray(kings, dtype=np.uint32)[:, None] >> _BITS) & 1
+    positions = ((white - black) * (kings + 1)).astype(np.int8)
+    if not white_up:
+        # Turning the board around reverses the square numbers
+        positions = positions[:, ::-1]
+    return positions
+
+
+# Returns the position row of a board
+def encode_board(board):
+    return encode_masks([board.get_color_mask('W')], [board.get_color_mask('B')],
+                        [board.get_king_mask()], board.get_color_up() == 'W')[0]
+
+
+# Counts, per position, the quiet steps available to the pieces of a mask
+def _count_steps(movers, empty, directions):
+    steps = np.zeros(len(movers), dtype=np.int32)
+    for direction in directions:
+        for source, shift in SHIFTS[direction]:
+            if shift < 0:
+                targets = (movers & np.uint32(source)) >> np.uint32(-shift)
+            else:
+                targets = (movers & np.uint32(source)) << np.uint32(shift)
+            steps += _popcount(targets & empty)
+    return steps
+
+
+# Returns the (N, len(TERMS)) matrix of white minus black counts of every term
+def compute_features(positions):
+    positions = np.asarray(positions, dtype=np.int8)
+    count = len(positions)
+    planes = np.stack([positions == WHITE_MAN, positions == WHITE_KING,
+                       positions == BLACK_MAN, positions == BLACK_KING], axis=1)
+
+    features = np.empty((count, len(TERMS)), dtype=np.float32)
+    # Material, kings, rows men have come from their back rank and men still
+    # guarding it are sums of per-square weights, one product for the batch
+    features[:, :4] = planes.reshape(count, 128).astype(np.float32) @ _SQUARE_TERMS
+
+    # Mobility works on the planes packed back into masks, one bit per square
+    masks = np.packbits(planes, axis=2, bitorder="little").view("<u4")[:, :, 0]
+    empty = ~(masks[:, 0] | masks[:, 1] | masks[:, 2] | masks[:, 3])
+    features[:, 4] = (_count_steps(masks[:, 0], empty, UP_DIRECTIONS)
+                      + _count_steps(masks[:, 1], empty, ALL_DIRECTIONS)
+                      - _count_steps(masks[:, 2], empty, DOWN_DIRECTIONS)
+                      - _count_steps(masks[:, 3], empty, ALL_DIRECTIONS))
+    return features
+
+
+# Reads weights written by save_weights
+def load_weights(path):
+    with open(path) as weights_file:
+        return json.load(weights_file)
+
+
+# Writes weights as a JSON object of term names to values
+def save_weights(path, weights):
+    with open(path, "w") as weights_file:
+        json.dump(weights, weights_file, indent=2)
+        weights_file.write("\n")
+
+
+class BatchEvaluator:
+    # Initilize the evaluator with a weight per term, missing terms keep their default
+    def __init__(self, weights=None):
+        merged = dict(DEFAULT_WEIGHTS)
+        merged.update(weights or {})
+        unknown = set(merged) - set(TERMS)
+        if unknown:
+            raise ValueError(f"unknown evaluation terms: {', '.join(sorted(unknown))}")
+        self.weights = np.array([merged[term] for term in TERMS], dtype=np.float32)
+
+    # Return the weights as a dict
+    def get_weights(self):
+        return {term: float(weight) for term, weight in zip(TERMS, self.weights)}
+
+    # Scores a batch of position rows from white's side, a side with no pieces left scores as a win
+    def evaluate(self, positions):
+        positions = np.asarray(positions, dtype=np.int8)
+        scores = (compute_features(positions) @ self.weights).astype(np.float64)
+        white_left = (positions > 0).any(axis=1)
+        black_left = (positions < 0).any(axis=1)
+        scores[~black_left] = WIN_SCORE
+        scores[~white_left] = -WIN_SCORE
+        return scores
+
+    # Scores positions given as white, black and king masks from the side of color
+    def evaluate_masks(self, white, black, kings, color, white_up=True):
+        scores = self.evaluate(encode_masks(white, black, kings, white_up))
+        return scores if color == 'W' else -scores
+
+
+# Returns random position rows with about half the squares taken, for benchmarks
+def random_positions(count, seed=0):
+    generator = np.random.default_rng(seed)
+    positions = generator.choice(np.array([0, 0, 0, 0, WHITE_MAN, WHITE_KING, BLACK_MAN, BLACK_KING],
+                                          dtype=np.int8), size=(count, 32))
+    return positions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Measure batched evaluation throughput.")
+    parser.add_argument("--positions", type=int, default=1_000_000)
+    parser.add_argument("--batch", type=int, default=65536)
+    args = parser.parse_args(argv)
+
+    positions = random_positions(args.positions)
+    evaluator = BatchEvaluator()
+    start = time.perf_counter()
+    for first in range(0, len(positions), args.batch):
+        evaluator.evaluate(positions[first:first + args.batch])
+    elapsed = time.perf_counter() - start
+    print(f"{args.positions} positions in {elapsed:.3f}s: {args.positions / elapsed:,.0f} positions/s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
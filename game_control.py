@@ -1,18 +1,21 @@
-from piece import Piece
-from board import Board
+from board import Board, get_starting_pieces
 from board_gui import BoardGUI
+from geometry import JUMPED
 from held_piece import HeldPiece
-from utils import get_surface_mouse_offset, get_position_with_row_col
+from ponder import PonderingEngine
+from utils import get_surface_mouse_offset
 
 
 class GameControl:
-    # Initilize the game controls
-    def __init__(self, player_color):
+    # Initilize the game controls, with an AI the other color is played by the computer
+    def __init__(self, player_color, ai=None, ponder=True):
+        self.player_color = player_color
         self.turn = player_color
         self.board = None
         self.board_draw = None
         self.held_piece = None
         self.winner = None
+        self.engine = PonderingEngine(ai, ponder) if ai is not None else None
 
         self.setup()
 
@@ -22,16 +25,7 @@ class GameControl:
 
     # Default setup of the game
     def setup(self):
-        # Initial setup
-        pieces = []
-
-        for opponent_piece in range(0, 12):
-            pieces.append(Piece(str(opponent_piece) + 'BN'))
-
-        for player_piece in range(20, 32):
-            pieces.append(Piece(str(player_piece) + 'WN'))
-
-        self.board = Board(pieces, self.turn)
+        self.board = Board(get_starting_pieces(), self.turn)
         self.board_draw = BoardGUI(self.board)
 
     # Display pieces and board on the screen
@@ -42,72 +36,109 @@ class GameControl:
         if self.held_piece is not None:
             self.held_piece.draw_piece(display_surface)
 
+    # Redraws only what changed since the last call and returns the areas
+    # drawn, draw_screen must have drawn everything once before
+    def draw_changes(self, display_surface):
+        if self.held_piece is not None:
+            old_rect = self.held_piece.get_rect().copy()
+            if self.held_piece.follow_mouse():
+                self.board_draw.mark_dirty(old_rect)
+                self.board_draw.mark_dirty(self.held_piece.get_rect())
+        return self.board_draw.draw_dirty(display_surface, self.held_piece)
+
+    # Adds an area of the screen for draw_changes to draw again
+    def mark_dirty(self, rect):
+        self.board_draw.mark_dirty(rect)
+
     # Return a winner 
     def get_winner(self):
         return self.winner
 
-    # Ensure that that prioirty is given to eating, and the player is clicking their pieces
+    # Return whether the computer is searching for its move
+    def is_computer_thinking(self):
+        return self.engine is not None and self.turn == self.engine.get_color() and self.winner is None
+
+    # Return (depth finished, nodes searched) of the computer's search
+    def get_computer_progress(self):
+        return self.engine.get_progress()
+
+    # Called every frame, plays the computer's move once its search is done
+    def update(self):
+        if not self.is_computer_thinking():
+            return
+
+        done, move = self.engine.poll()
+        if not done:
+            return
+        if move is None:
+            # The computer can't move and loses
+            self.winner = 'B' if self.engine.get_color() == 'W' else 'W'
+            return
+
+        self.board.make_move(move)
+        self.show_move(move)
+        self.winner = self.board.get_winner()
+        self.turn = self.board.get_turn()
+        if self.winner is None:
+            self.engine.start_pondering(self.board)
+
+    # Patches the pieces on screen after a move given as the path of squares the piece visited
+    def show_move(self, path):
+        captured = [JUMPED[square][next_square] for square, next_square in zip(path, path[1:])
+                    if JUMPED[square][next_square] != -1]
+        is_king = self.board.get_piece_at(path[-1]).is_king()
+        self.board_draw.apply_move(path[0], path[-1], captured, is_king)
+
+    # Stops the computer's background search, e.g. when the window closes
+    def close(self):
+        if self.engine is not None:
+            self.engine.close()
+
+    # Ensure that that prioirty is given to eating, and the player is clicking their pieces.
+    # Nothing can be picked up while the computer thinks about its move.
     def hold_piece(self, mouse_pos):
-        piece_clicked = self.board_draw.get_piece_on_mouse(mouse_pos)
-        board_pieces = self.board.get_pieces()
-        eat_constraint = False
+        if self.is_computer_thinking():
+            return
+        origin = self.board_draw.get_piece_on_mouse(mouse_pos)
 
-        if piece_clicked is None:
+        if origin is None:
             return
-        if piece_clicked['piece']['color'] != self.turn:
+        if self.board_draw.get_piece_at(origin)['color'] != self.turn:
             return
 
-        # Is there any capturing move available for the current color?
-        for piece in board_pieces:
-            if piece.get_color() != self.turn:
-                continue
-            for move in piece.get_moves(self.board):
-                if move.get('eats_piece'):
-                    eat_constraint = True
-                    break
-            if eat_constraint:
-                break
-
-        piece_moves = board_pieces[piece_clicked['index']].get_moves(self.board)
-
-        if eat_constraint:
-            piece_moves = list(filter(lambda m: m.get("eats_piece") is True, piece_moves))
-
-        move_spots = []
-        for move in piece_moves:
-            target_pos = int(move["position"])  # board index 0..31
-            row = self.board.get_row_number(target_pos)
-            column = self.board.get_col_number(target_pos)
-            move_spots.append((row, column))
+        # Captures are mandatory, so only offer them when the side has any
+        side_moves = self.board.generate_moves(self.turn)
+        piece_moves = side_moves["captures"] if side_moves["must_eat"] else side_moves["quiet"]
 
+        move_spots = [position_to for position_from, position_to in piece_moves if position_from == origin]
         self.board_draw.set_move_marks(move_spots)
-        self.board_draw.hide_piece(piece_clicked['index'])
-        self.set_held_piece(piece_clicked['index'], board_pieces[piece_clicked['index']], mouse_pos)
+        self.board_draw.hide_piece(origin)
+        self.set_held_piece(origin, self.board.get_piece_at(origin), mouse_pos)
 
     # Once the piece is released update board and game
     def release_piece(self):
         if self.held_piece is None:
             return
 
-        position_released = self.held_piece.check_collision(self.board_draw.get_move_marks())
-        moved_index = self.board_draw.show_piece()
-        piece_moved = self.board.get_piece_by_index(moved_index)
+        position_to = self.board_draw.get_drop_square(self.held_piece.get_rect())
+        moved_square = self.board_draw.show_piece()
 
-        if position_released is not None:
-            self.board.move_piece(moved_index, self.board_draw.get_position_by_rect(position_released))
-            self.board_draw.set_pieces(self.board_draw.get_piece_properties(self.board))
+        if position_to is not None:
+            self.board.move_piece_at(moved_square, position_to)
+            self.show_move((moved_square, position_to))
             self.winner = self.board.get_winner()
 
-            jump_moves = list(filter(lambda move: move["eats_piece"] == True, piece_moved.get_moves(self.board)))
-
-            if len(jump_moves) == 0 or piece_moved.get_has_eaten() == False:
-                self.turn = "B" if self.turn == "W" else "W"
+            # The board keeps the turn while the moved piece can keep jumping
+            self.turn = self.board.get_turn()
+            if self.is_computer_thinking():
+                self.engine.submit(self.board)
 
+        self.board_draw.mark_dirty(self.held_piece.get_rect())
         self.held_piece = None
         self.board_draw.set_move_marks([])
 
     # Ensuring the piece select is set on a new and valid tile
-    def set_held_piece(self, index, piece, mouse_pos):
+    def set_held_piece(self, square, piece, mouse_pos):
         surface = self.board_draw.get_surface(piece)
-        offset = get_surface_mouse_offset(self.board_draw.get_piece_by_index(index)["rect"], mouse_pos)
+        offset = get_surface_mouse_offset(self.board_draw.get_piece_at(square)["rect"], mouse_pos)
         self.held_piece = HeldPiece(surface, offset)
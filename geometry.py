@@ -0,0 +1,96 @@
+# Square geometry of the board, computed once at import
+#
+# The 32 dark squares are numbered 0 to 31 from the top left, four per row.
+# Every table is indexed by square number and holds -1 where a step would
+# leave the board.
+
+UP_LEFT = 0
+UP_RIGHT = 1
+DOWN_LEFT = 2
+DOWN_RIGHT = 3
+
+# Directions a man may take depending on which way it moves, kings use all four
+UP_DIRECTIONS = (UP_LEFT, UP_RIGHT)
+DOWN_DIRECTIONS = (DOWN_LEFT, DOWN_RIGHT)
+ALL_DIRECTIONS = UP_DIRECTIONS + DOWN_DIRECTIONS
+
+# Row and column steps of each direction
+_STEPS = ((-1, -1), (-1, 1), (1, -1), (1, 1))
+
+# Every dark square is one bit, square 0 is bit 0 and square 31 is bit 31
+FULL_MASK = 0xFFFFFFFF
+
+# Squares grouped by row parity and by their place inside the row. Moving one
+# step shifts a square by 3, 4 or 5 depending on the parity of its row, so
+# each direction is split into the two shifts that apply to it.
+EVEN_ROWS = 0x0F0F0F0F
+ODD_ROWS = 0xF0F0F0F0
+EVEN_ROWS_NOT_LEFT = 0x0E0E0E0E
+ODD_ROWS_NOT_RIGHT = 0x70707070
+
+# (source mask, shift) pairs for each direction, negative shifts move up
+SHIFTS = (
+    ((EVEN_ROWS_NOT_LEFT, -5), (ODD_ROWS, -4)),
+    ((EVEN_ROWS, -4), (ODD_ROWS_NOT_RIGHT, -3)),
+    ((EVEN_ROWS_NOT_LEFT, 3), (ODD_ROWS, 4)),
+    ((EVEN_ROWS, 4), (ODD_ROWS_NOT_RIGHT, 5)),
+)
+
+# Square distance covered by a jump in each direction
+JUMP_DISTANCE = (-9, -7, 7, 9)
+
+# Row a man is crowned on, indexed by whether it moves up the board
+PROMOTION_ROW = (7, 0)
+
+ROW = tuple(square // 4 for square in range(32))
+COLUMN = tuple((square % 4) * 2 + (square // 4) % 2 for square in range(32))
+
+# Square number of a (row, column) pair, -1 on light squares
+SQUARE_AT = tuple(
+    tuple(row * 4 + column // 2 if (row + column) % 2 == 0 else -1 for column in range(8))
+    for row in range(8)
+)
+
+
+def _square_after(square, direction, distance):
+    row = ROW[square] + _STEPS[direction][0] * distance
+    column = COLUMN[square] + _STEPS[direction][1] * distance
+    if 0 <= row < 8 and 0 <= column < 8:
+        return SQUARE_AT[row][column]
+    return -1
+
+
+# NEIGHBORS[direction][square] is the adjacent square in that direction
+NEIGHBORS = tuple(tuple(_square_after(square, direction, 1) for square in range(32))
+                  for direction in range(4))
+
+# JUMPS[direction][square] is where a piece lands after jumping in that direction
+JUMPS = tuple(tuple(_square_after(square, direction, 2) for square in range(32))
+              for direction in range(4))
+
+# JUMPED[from][to] is the square jumped over by a jump from one square to another
+JUMPED = tuple(
+    tuple(next((NEIGHBORS[direction][start] for direction in range(4)
+                if JUMPS[direction][start] == end and end != -1), -1)
+          for end in range(32))
+    for start in range(32)
+)
+
+
+# Moves every square of a mask one step in a direction
+def shift_mask(mask, direction):
+    result = 0
+    for source, shift in SHIFTS[direction]:
+        if shift < 0:
+            result |= (mask & source) >> -shift
+        else:
+            result |= ((mask & source) << shift) & FULL_MASK
+    return result
+
+
+# Yields the square of every set bit of a mask
+def iter_squares(mask):
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
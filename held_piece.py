@@ -7,17 +7,25 @@ class HeldPiece:
         self.draw_rect = self.surface.get_rect()
         self.offset = offset
         
-    # Update piece with the mouse
-    def draw_piece(self, display_surface):
-        mouse_pos = get_mouse_pos()
-        self.draw_rect.x = mouse_pos[0] + self.offset[0]
-        self.draw_rect.y = mouse_pos[1] + self.offset[1]
+    # Return the image of the piece
+    def get_surface(self):
+        return self.surface
 
-        display_surface.blit(self.surface, self.draw_rect)
+    # Return where the piece is drawn
+    def get_rect(self):
+        return self.draw_rect
 
-    # Sees if the move made by user collides with any valid moves
-    def check_collision(self, rect_list):
-        for rect in rect_list:
-            if rect.colliderect(self.draw_rect):
-                return rect
-        return None
\ No newline at end of file
+    # Move the piece with the mouse, returns whether it moved
+    def follow_mouse(self):
+        mouse_pos = get_mouse_pos()
+        x = mouse_pos[0] + self.offset[0]
+        y = mouse_pos[1] + self.offset[1]
+        moved = (x, y) != (self.draw_rect.x, self.draw_rect.y)
+        self.draw_rect.x = x
+        self.draw_rect.y = y
+        return moved
+
+    # Update piece with the mouse
+    def draw_piece(self, display_surface):
+        self.follow_mouse()
+        display_surface.blit(self.surface, self.draw_rect)
\ No newline at end of file
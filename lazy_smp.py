@@ -0,0 +1,200 @@
+# Parallel search: worker processes search the same root and share one
+# transposition table in shared memory (Lazy SMP)
+import argparse
+import multiprocessing
+import os
+import queue
+import sys
+import time
+from multiprocessing import shared_memory
+
+from ai import AI
+from board import Board
+from piece import Piece
+from transposition import TranspositionTable, DEFAULT_ENTRIES, get_table_size
+
+
+# Extra time given to the workers to report before the search is cut off
+REPORT_GRACE = 0.05
+
+# Time a stopped worker gets to report before it is given up on, and to exit on close
+STOP_TIMEOUT = 1.0
+
+# Positions used to measure the speedup, as (pieces, color moving up, side to move)
+BENCHMARK_POSITIONS = [
+    ([str(square) + 'BN' for square in range(12)] + [str(square) + 'WN' for square in range(20, 32)], 'W', 'W'),
+    (['0BN', '1BN', '2BN', '5BN', '6BN', '9BN', '10BN', '14BN', '17WN', '21WN', '22WN', '23WN',
+      '25WN', '26WN', '29WN', '30WN'], 'W', 'W'),
+    (['1BN', '3BN', '6BN', '10BN', '12BY', '16WN', '22WN', '26WN', '27WY', '30WN'], 'W', 'B'),
+]
+
+
+# Loop run by every worker process: take a search, report each finished depth, repeat
+def _worker(index, memory_name, entries, tasks, results, stop_event):
+    memory = shared_memory.SharedMemory(name=memory_name)
+    table = TranspositionTable(entries, memory.buf)
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            search_id, pieces, color_up, turn, color, max_depth, time_limit, generation = task
+            table.generation = generation
+            board = Board([Piece(name) for name in pieces], color_up, turn)
+            engine = AI(color, max_depth, time_limit, table=table, stop_event=stop_event)
+
+            def progress(depth, score, move, nodes):
+                results.put((search_id, index, depth, score, move, nodes, False))
+
+            # Helpers start one ply deeper every other worker and order the root differently
+            engine.search(board, progress, start_depth=1 + index % 2, root_shift=index)
+            results.put((search_id, index, engine.completed_depth, None, None, engine.nodes, True))
+    finally:
+        table.close()
+        memory.close()
+
+
+class ParallelAI:
+    # Initilize the AI and start its worker processes
+    def __init__(self, color, workers=None, max_depth=10, time_limit=1.0, table_entries=DEFAULT_ENTRIES):
+        self.color = color
+        self.workers = workers or os.cpu_count()
+        self.max_depth = max_depth
+        self.time_limit = time_limit
+        self.nodes = 0
+        self.completed_depth = 0
+        self.search_id = 0
+
+        self.memory = shared_memory.SharedMemory(create=True, size=get_table_size(table_entries))
+        self.table = TranspositionTable(table_entries, self.memory.buf)
+        self.table.clear()
+        self.tasks = [multiprocessing.Queue() for _ in range(self.workers)]
+        self.results = multiprocessing.Queue()
+        self.stop_event = multiprocessing.Event()
+        self.processes = [
+            multiprocessing.Process(target=_worker, daemon=True,
+                                    args=(index, self.memory.name, table_entries, self.tasks[index],
+                                          self.results, self.stop_event))
+            for index in range(self.workers)
+        ]
+        for process in self.processes:
+            process.start()
+
+    # Return the color the AI plays
+    def get_color(self):
+        return self.color
+
+    # Runs one search on every worker, returns (score, move) of the deepest depth any worker finished
+    def search(self, board):
+        self.nodes = 0
+        self.completed_depth = 0
+        moves = board.get_legal_moves(self.color)
+        if len(moves) < 2:
+            return None, moves[0] if moves else None
+
+        self.search_id += 1
+        self.table.new_search()
+        pieces = [piece.get_name() for piece in board.get_pieces()]
+        task = (self.search_id, pieces, board.get_color_up(), self.color, self.color,
+                self.max_depth, self.time_limit, self.table.generation)
+        for tasks in self.tasks:
+            tasks.put(task)
+
+        best_score, best_move = None, moves[0]
+        worker_nodes = [0] * self.workers
+        finished = set()
+        stopping = False
+        deadline = time.perf_counter() + self.time_limit + REPORT_GRACE
+        while len(finished) < self.workers:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0 and not stopping:
+                self.stop_event.set()
+                stopping = True
+            try:
+                report = self.results.get(timeout=max(remaining, REPORT_GRACE))
+            except queue.Empty:
+                # A worker that died never reports, and one that ignores the stop
+                # isn't waited on for ever; the best result so far is returned
+                waiting = [self.processes[index] for index in range(self.workers) if index not in finished]
+                if not any(process.is_alive() for process in waiting):
+                    break
+                if stopping and remaining < -STOP_TIMEOUT:
+                    break
+                continue
+            search_id, index, depth, score, move, nodes, done = report
+            if search_id != self.search_id:
+                continue
+
+            worker_nodes[index] = nodes
+            if done:
+                finished.add(index)
+            elif depth > self.completed_depth:
+                self.completed_depth = depth
+                best_score, best_move = score, move
+
+            # Once one worker reaches the full depth the others have nothing left to add
+            if not stopping and self.completed_depth >= self.max_depth:
+                self.stop_event.set()
+                stopping = True
+
+        self.stop_event.clear()
+        self.nodes = sum(worker_nodes)
+        return best_score, best_move
+
+    # Returns the move the AI wants to play, a multi-jump goes from its first to its last square
+    def get_move(self, board):
+        score, move = self.search(board)
+        if move is None:
+            return None
+        return {"position_from": str(move[0]), "position_to": str(move[-1])}
+
+    # Stops the worker processes and frees the shared table
+    def close(self):
+        for tasks in self.tasks:
+            tasks.put(None)
+        for process in self.processes:
+            process.join(STOP_TIMEOUT)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+        self.table.close()
+        self.memory.close()
+        self.memory.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+# Times the benchmark positions to a fixed depth, returns the total seconds
+def time_to_depth(workers, depth, report=print):
+    total = 0.0
+    for pieces, color_up, turn in BENCHMARK_POSITIONS:
+        board = Board([Piece(name) for name in pieces], color_up, turn)
+        with ParallelAI(turn, workers=workers, max_depth=depth, time_limit=3600) as engine:
+            start = time.perf_counter()
+            score, move = engine.search(board)
+            elapsed = time.perf_counter() - start
+        total += elapsed
+        report(f"{workers} worker(s): depth {engine.completed_depth} in {elapsed:.3f}s, "
+               f"{engine.nodes} nodes, best move {move}")
+    return total
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Measure the Lazy SMP speedup over one worker.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--depth", type=int, default=8)
+    args = parser.parse_args(argv)
+
+    single = time_to_depth(1, args.depth)
+    parallel = time_to_depth(args.workers, args.depth)
+    print(f"speedup with {args.workers} workers: {single / parallel:.2f}x "
+          f"({single:.3f}s -> {parallel:.3f}s to depth {args.depth})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,6 @@
 import sys
 import pygame
 
-pygame.init()
 from pages import Screen
 
 FPS = 60
@@ -9,6 +8,7 @@ WIDTH, HEIGHT = 720, 480
 
 # Main class
 def main() -> int:
+    pygame.init()
     app = Screen(size=(WIDTH, HEIGHT))
     pygame.display.set_caption(app.title)
 
@@ -1,10 +1,6 @@
 from __future__ import annotations
-from checkers import main
-
 import pygame
 
-pygame.init()
-
 from ui_elements import *
 from user_manager import User_manager
 
@@ -191,10 +187,11 @@ class HomePage(ScreenBase, CardMixin):
         super().__init__(screen)
         rect = self.card_rect()
         self.btn_player = Button(rect.x, rect.y, 320, 48, "Play vs Player", primary=False)
+        self.btn_computer = Button(rect.x, rect.y, 320, 48, "Play vs Computer", primary=False)
         self.btn_settings = Button(rect.x, rect.y, 320, 48, "Settings", primary=False)
         self.btn_logout = Button(rect.x, rect.y, 320, 48, "Log Out", primary=False)
 
-        self._buttons = [self.btn_player,self.btn_settings, self.btn_logout]
+        self._buttons = [self.btn_player, self.btn_computer, self.btn_settings, self.btn_logout]
 
     def _apply_vertical_layout(self) -> None:
         rect = self.card_rect()
@@ -208,7 +205,13 @@ class HomePage(ScreenBase, CardMixin):
 
     def handle_event(self, event: pygame.event.Event) -> None:
         if self.btn_player.handle_event(event):
+            # The game and its engine are only imported once a game is played
+            from checkers import main
             main()
+        if self.btn_computer.handle_event(event):
+            from checkers import main
+            # The player has white, results against the computer are recorded
+            main(ai_color="B", username=self.screen.current_user)
         if self.btn_logout.handle_event(event):
             self.screen.current_user = None
             self.screen.goto(MODE_LOGIN, toast=("You have been logged out.", Theme.MUTED))
@@ -0,0 +1,95 @@
+# Move generator benchmark and correctness check: counts the leaf nodes of the
+# full game tree to a fixed depth and compares them with reference counts
+import argparse
+import sys
+import time
+
+from board import Board, get_starting_pieces
+from piece import Piece
+
+
+# name: (pieces, color moving up, side to move, leaf counts from depth 1)
+POSITIONS = {
+    # The GameControl.setup position, the counts are the published English draughts perft numbers
+    "opening": (None, 'W', 'W',
+                [7, 49, 302, 1469, 7361, 36768, 179740, 845931, 3963680, 18391564]),
+    # Kings of both colors in the middle of the board, white must open with a capture
+    "kings": (['13WY', '18WY', '27WN', '9BY', '22BY', '2BN'], 'W', 'W',
+              [1, 2, 14, 55, 269, 1144]),
+    # A triple jump that splits on its last hop
+    "multi-jump": (['29WN', '30WN', '25BN', '17BN', '18BN', '10BN', '9BN', '11BN', '1BN'], 'W', 'W',
+                   [2, 9, 34, 229, 787, 4233]),
+    # Pieces on the side columns can't be jumped
+    "edge-captures": (['12WN', '20WN', '15WN', '8BN', '16BN', '11BN', '19BN', '4BY'], 'W', 'B',
+                      [2, 2, 9, 18, 134, 266]),
+    # A man crowned by a jump stops even though the new king could jump again
+    "crowning-jump": (['9WN', '5BN', '6BN', '14WY', '1BN', '23BN'], 'W', 'W',
+                      [1, 5, 6, 17, 76, 241]),
+}
+
+
+# Builds the board of a named position
+def get_position(name):
+    pieces, color_up, turn, _ = POSITIONS[name]
+    if pieces is None:
+        return Board(get_starting_pieces(), color_up, turn)
+    return Board([Piece(piece) for piece in pieces], color_up, turn)
+
+
+# Returns the reference leaf count of a position, or None when it isn't known that deep
+def get_reference(name, depth):
+    counts = POSITIONS[name][3]
+    return counts[depth - 1] if depth <= len(counts) else None
+
+
+# Counts the positions reached after exactly `depth` moves
+def perft(board, depth):
+    if depth == 0:
+        return 1
+    moves = board.get_legal_moves(board.get_turn())
+    if depth == 1:
+        return len(moves)
+
+    nodes = 0
+    for move in moves:
+        token = board.make_move(move)
+        nodes += perft(board, depth - 1)
+        board.unmake_move(token)
+    return nodes
+
+
+# Runs perft on the given positions for every depth up to `depth`, returns whether all counts matched
+def run(names, depth, report=print):
+    all_match = True
+    for name in names:
+        board = get_position(name)
+        for current_depth in range(1, depth + 1):
+            start = time.perf_counter()
+            nodes = perft(board, current_depth)
+            elapsed = time.perf_counter() - start
+
+            reference = get_reference(name, current_depth)
+            if reference is None:
+                status = "no reference"
+            elif nodes == reference:
+                status = "ok"
+            else:
+                status = f"MISMATCH, expected {reference}"
+                all_match = False
+            speed = nodes / elapsed if elapsed > 0 else 0
+            report(f"{name:14s} depth {current_depth:2d} {nodes:10d} nodes {elapsed:8.3f}s "
+                   f"{speed:12.0f} nodes/s  {status}")
+    return all_match
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Count move generator leaf nodes and check them.")
+    parser.add_argument("depth", type=int, nargs="?", default=6)
+    parser.add_argument("--position", choices=sorted(POSITIONS), action="append")
+    args = parser.parse_args(argv)
+
+    return 0 if run(args.position or list(POSITIONS), args.depth) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,22 +1,36 @@
 # Class for each piece 
-from utils import get_position_with_row_col
+from geometry import ROW, COLUMN, NEIGHBORS, JUMPS, UP_DIRECTIONS, DOWN_DIRECTIONS, ALL_DIRECTIONS
+
+WHITE = 0
+BLACK = 1
+COLOR_NAMES = ('W', 'B')
+
 
 class Piece:
-    # Initilize a piece
+    __slots__ = ("square", "color", "king", "has_eaten")
+
+    # Initilize a piece from its name, e.g. '20WN' is a white man on square 20
     def __init__(self, name):
-        self.name = name
+        self.square = int(name[:-2])
+        self.color = BLACK if name[-2] == 'B' else WHITE
+        self.king = name[-1] == 'Y'
         self.has_eaten = False
-    # Returns piece name, consists of position, color, king status, and hidden
+
+    # Returns piece name, consists of position, color, and king status
     def get_name(self):
-        return self.name
+        return str(self.square) + COLOR_NAMES[self.color] + ('Y' if self.king else 'N')
 
     # Return piece position
     def get_position(self):
-        return self.name[:-2]
+        return str(self.square)
+
+    # Return piece position as a square number
+    def get_square(self):
+        return self.square
 
     # Return piece color
     def get_color(self):
-        return self.name[-2]
+        return COLOR_NAMES[self.color]
 
     # Return whether piece has been eaten
     def get_has_eaten(self):
@@ -24,82 +38,61 @@ class Piece:
 
     # Return whether a piece is a king or not
     def is_king(self):
-        return self.name[-1] == 'Y'
+        return self.king
 
     # Set a new position for a piece
     def set_position(self, new_position):
-        position_index = 1 if len(self.name) == 3 else 2
-        self.name = str(new_position) + self.name[position_index:]
+        self.square = int(new_position)
 
     # Set a piece to be king
     def set_is_king(self, new_is_king):
-        if new_is_king:
-            self.name = self.name[:-1] + "Y"
-        else:
-            self.name = self.name[:-1] + "N"
+        self.king = bool(new_is_king)
 
     # Set a value for if a piece has been eaten
     def set_has_eaten(self, new_has_eaten):
         self.has_eaten = new_has_eaten
 
+    # Returns a new piece with the same square, color and king status
+    def copy(self):
+        piece = Piece.__new__(Piece)
+        piece.square = self.square
+        piece.color = self.color
+        piece.king = self.king
+        piece.has_eaten = False
+        return piece
+
+    # Returns the directions the piece may move in
+    def get_directions(self, board):
+        if self.king:
+            return ALL_DIRECTIONS
+        if board.get_color_up() == self.get_color():
+            return UP_DIRECTIONS
+        return DOWN_DIRECTIONS
+
     # Get possible moves for a piece
     def get_adjacent_squares(self, board):
-        current_col = board.get_col_number(int(self.get_position()))
-        current_row = board.get_row_number(int(self.get_position()))
-
-        if self.is_king():
-            coords = [
-                (current_row - 1, current_col - 1),
-                (current_row - 1, current_col + 1),
-                (current_row + 1, current_col - 1),
-                (current_row + 1, current_col + 1),
-            ]
-        else:
-            if board.get_color_up() == self.get_color():
-                coords = [(current_row - 1, current_col - 1),
-                          (current_row - 1, current_col + 1)]
-            else:
-                coords = [(current_row + 1, current_col - 1),
-                          (current_row + 1, current_col + 1)]
-
-        return [c for c in coords if c[0] not in (-1, 8) and c[1] not in (-1, 8)]
+        squares = [NEIGHBORS[direction][self.square] for direction in self.get_directions(board)]
+        return [(ROW[square], COLUMN[square]) for square in squares if square != -1]
 
     # Return all legal moves
     def get_moves(self, board):
-        def get_eat_position(blocking_piece, coords):
-            if (blocking_piece.get_color() == own_color) or (coords[0] in (0, 7)) or (coords[1] in (0, 7)):
-                return None
-
-            if coords[1] > current_col:
-                target = (coords[0] + (coords[0] - current_row), coords[1] + 1)
-            else:
-                target = (coords[0] + (coords[0] - current_row), coords[1] - 1)
-
-            position_num = get_position_with_row_col(target[0], target[1])
-            return None if board.has_piece(position_num) else position_num
-
-        current_col = board.get_col_number(int(self.get_position()))
-        current_row = board.get_row_number(int(self.get_position()))
-        own_color = self.get_color()
-
-        possible_coords = self.get_adjacent_squares(board)
-        close_squares = board.get_pieces_by_coords(*possible_coords)
-
         possible_moves = []
-        empty_indices = []
+        empty_squares = []
 
-        for idx, occupant in enumerate(close_squares):
+        for direction in self.get_directions(board):
+            adjacent = NEIGHBORS[direction][self.square]
+            if adjacent == -1:
+                continue
+            occupant = board.get_piece_at(adjacent)
             if occupant is None:
-                empty_indices.append(idx)
-            else:
-                eat_pos = get_eat_position(occupant, possible_coords[idx])
-                if eat_pos is not None:
-                    possible_moves.append({"position": str(eat_pos), "eats_piece": True})
+                empty_squares.append(adjacent)
+            elif occupant.color != self.color:
+                landing = JUMPS[direction][self.square]
+                if landing != -1 and not board.has_piece(landing):
+                    possible_moves.append({"position": str(landing), "eats_piece": True})
 
         if len(possible_moves) == 0:
-            for idx in empty_indices:
-                nr, nc = possible_coords[idx]
-                new_pos = get_position_with_row_col(nr, nc)
-                possible_moves.append({"position": str(new_pos), "eats_piece": False})
+            for square in empty_squares:
+                possible_moves.append({"position": str(square), "eats_piece": False})
 
         return possible_moves
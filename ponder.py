@@ -0,0 +1,151 @@
+# Runs the AI in a background thread so the game loop keeps drawing while it
+# thinks, and lets it ponder: while the opponent thinks, it guesses the reply
+# and searches the position that reply leads to
+import threading
+
+from ai import AI
+
+
+# Time spent guessing the opponent's reply before pondering starts
+PREDICT_TIME = 0.2
+PREDICT_DEPTH = 6
+PREDICT_TABLE_ENTRIES = 1 << 14
+
+# Pondering has no clock of its own, it runs until the opponent moves
+PONDER_TIME = 3600.0
+
+
+class PonderingEngine:
+    # Initilize the engine around an AI, pondering shares the AI's transposition
+    # table. progress(depth, score, move, nodes) is called from the search
+    # thread after every depth the AI's own search finishes.
+    def __init__(self, ai, ponder=True, progress=None):
+        self.ai = ai
+        self.ponder = ponder
+        self.progress = progress
+        self.thread = None
+        self.result = None
+        self.stop_event = threading.Event()
+        self.ai.set_stop_event(self.stop_event)
+        self.ponder_ai = AI(ai.get_color(), ai.max_depth, PONDER_TIME, table=ai.table,
+                            stop_event=self.stop_event, book=ai.book, tablebase=ai.tablebase,
+                            evaluator=ai.evaluator)
+        self.predictor = AI(ai.get_opponent(ai.get_color()), PREDICT_DEPTH, PREDICT_TIME,
+                            table_entries=PREDICT_TABLE_ENTRIES, stop_event=self.stop_event,
+                            evaluator=ai.evaluator)
+        self.searching = False
+        self.search_depth = 0
+        self.ponder_hash = None
+        self.ponder_move = None
+        self.ponder_depth = 0
+        self.hits = 0
+        self.misses = 0
+
+    # Return the color the engine plays
+    def get_color(self):
+        return self.ai.get_color()
+
+    # Return whether a search or pondering is running
+    def is_thinking(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    # Return whether a submitted search hasn't been collected by poll() yet
+    def is_searching(self):
+        return self.searching
+
+    # Return (depth finished, nodes searched) of the current search
+    def get_progress(self):
+        return self.search_depth, self.ai.nodes
+
+    # Return how often the opponent played the reply pondered on, and how often not
+    def get_ponder_stats(self):
+        return {"hits": self.hits, "misses": self.misses}
+
+    # Starts searching for the AI's move on a copy of the board. Pondering is
+    # stopped first; when the opponent played the predicted reply its results
+    # are reused, straight away if it reached full depth, else through the table.
+    def submit(self, board):
+        pondered = self.stop_thread()
+        board = board.copy()
+        self.result = None
+        self.searching = True
+        self.search_depth = 0
+
+        if pondered is not None:
+            if pondered == board.get_hash():
+                self.hits += 1
+                if self.ponder_depth >= self.ai.max_depth and self.ponder_move is not None:
+                    self.search_depth = self.ponder_depth
+                    self.result = (True, self.ponder_move)
+                    return
+            else:
+                self.misses += 1
+
+        self.thread = threading.Thread(target=self._search, args=(board,), daemon=True)
+        self.thread.start()
+
+    # Returns (True, move) once the search has finished, move being None when
+    # the AI can't move, and (False, None) while it is still running
+    def poll(self):
+        if self.result is None:
+            return False, None
+        result, self.result = self.result, None
+        self.searching = False
+        return result
+
+    # Stops the search or the pondering, a cancelled search never reports its move
+    def cancel(self):
+        self.stop_thread()
+        self.result = None
+        self.searching = False
+
+    # Starts pondering on the board left after the AI's move, the opponent to move
+    def start_pondering(self, board):
+        self.stop_thread()
+        if not self.ponder:
+            return
+        self.ponder_move = None
+        self.ponder_depth = 0
+        self.thread = threading.Thread(target=self._ponder, args=(board.copy(),), daemon=True)
+        self.thread.start()
+
+    # Stops the running thread and returns the hash of the position pondered
+    # on, or None when it wasn't pondering or didn't get that far
+    def stop_thread(self):
+        if self.thread is not None:
+            self.stop_event.set()
+            self.thread.join()
+            self.thread = None
+            self.stop_event.clear()
+        pondered, self.ponder_hash = self.ponder_hash, None
+        return pondered
+
+    # Stops any running thread
+    def close(self):
+        self.cancel()
+
+    def _search(self, board):
+        def progress(depth, score, move, nodes):
+            self.search_depth = depth
+            if self.progress is not None:
+                self.progress(depth, score, move, nodes)
+
+        score, move = self.ai.search(board, progress)
+        if not self.stop_event.is_set():
+            self.result = (True, move)
+
+    def _ponder(self, board):
+        # The guess is the reply the opponent would pick in a short search
+        score, reply = self.predictor.search(board)
+        if reply is None or self.stop_event.is_set():
+            return
+        board.make_move(reply)
+        if board.get_turn() != self.get_color():
+            return
+
+        def progress(depth, score, move, nodes):
+            self.ponder_move, self.ponder_depth = move, depth
+
+        self.ponder_hash = board.get_hash()
+        self.ai.table.new_search()
+        self.ponder_ai.search(board, progress)
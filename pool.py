@@ -0,0 +1,137 @@
+# Bounded pool of database connections shared between threads
+#
+# Connections come from a connect() factory, so the pool works the same with
+# mysql-connector, sqlite3 or anything else following the DB-API. A connection
+# that sat idle for a while is checked before it is handed out and replaced
+# when it no longer answers.
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+DEFAULT_SIZE = 5
+DEFAULT_TIMEOUT = 5.0
+
+# Idle connections older than this are checked before being handed out
+DEFAULT_CHECK_AFTER = 30.0
+
+
+# Raised when no connection frees up in time
+class PoolTimeout(Exception):
+    pass
+
+
+# Returns whether a connection still answers a trivial query
+def ping(connection):
+    try:
+        cursor = connection.cursor()
+        try:
+            cursor.execute("SELECT 1")
+            cursor.fetchall()
+        finally:
+            cursor.close()
+        return True
+    except Exception:
+        return False
+
+
+class ConnectionPool:
+    # Initilize the pool, connections are only opened when they are needed
+    def __init__(self, connect, size=DEFAULT_SIZE, timeout=DEFAULT_TIMEOUT, check=ping,
+                 check_after=DEFAULT_CHECK_AFTER):
+        self.connect = connect
+        self.size = size
+        self.timeout = timeout
+        self.check = check
+        self.check_after = check_after
+        self.idle = deque()
+        self.opened = 0
+        self.closed = False
+        self.condition = threading.Condition()
+        self.stats = {"opened": 0, "reused": 0, "replaced": 0, "waits": 0}
+
+    # Return the pool counters
+    def get_stats(self):
+        return dict(self.stats, open=self.opened, idle=len(self.idle))
+
+    # Returns a connection, waiting up to the pool's timeout when all of them are in use
+    def acquire(self):
+        deadline = time.monotonic() + self.timeout
+        with self.condition:
+            while True:
+                if self.closed:
+                    raise PoolTimeout("the pool is closed")
+                if self.idle:
+                    connection, released_at = self.idle.pop()
+                    break
+                if self.opened < self.size:
+                    # The slot is taken now, the connection is opened outside the lock
+                    self.opened += 1
+                    connection = None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolTimeout(f"no connection free after {self.timeout}s")
+                self.stats["waits"] += 1
+                self.condition.wait(remaining)
+
+        if connection is not None:
+            if time.monotonic() - released_at < self.check_after or self.check(connection):
+                self.stats["reused"] += 1
+                return connection
+            # The connection went stale while idle, open a new one in its place
+            self._close(connection)
+            self.stats["replaced"] += 1
+
+        try:
+            connection = self.connect()
+        except Exception:
+            with self.condition:
+                self.opened -= 1
+                self.condition.notify()
+            raise
+        self.stats["opened"] += 1
+        return connection
+
+    # Gives a connection back, a broken one is closed and its slot freed
+    def release(self, connection, broken=False):
+        with self.condition:
+            if broken or self.closed:
+                self.opened -= 1
+            else:
+                self.idle.append((connection, time.monotonic()))
+            self.condition.notify()
+        if broken or self.closed:
+            self._close(connection)
+
+    # Lends a connection for a with block, it is returned as broken when the
+    # block raises one of broken_errors
+    @contextmanager
+    def connection(self, broken_errors=()):
+        connection = self.acquire()
+        broken = False
+        try:
+            yield connection
+        except broken_errors:
+            broken = True
+            raise
+        finally:
+            self.release(connection, broken)
+
+    # Closes the idle connections, the ones in use are closed when they come back
+    def close(self):
+        with self.condition:
+            self.closed = True
+            idle = list(self.idle)
+            self.idle.clear()
+            self.opened -= len(idle)
+            self.condition.notify_all()
+        for connection, _ in idle:
+            self._close(connection)
+
+    def _close(self, connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
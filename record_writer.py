@@ -0,0 +1,151 @@
+# Writes game results to the storage from a background thread
+#
+# submit() only puts the result on a queue, so the game loop never waits on a
+# disk or the database. The writer thread appends every result to a spool file
+# as soon as it gets it and stores results in the database in batches with one
+# executemany, once batch_size of them are waiting or interval seconds after
+# the first one came in. The spool only keeps results the database doesn't
+# have yet and is read back when a writer starts, so results still waiting
+# when the process exits are stored the next time. A crash between a commit
+# and the spool being cleared stores that batch twice rather than losing it.
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+
+
+DEFAULT_SPOOL = "records.spool"
+DEFAULT_BATCH_SIZE = 64
+DEFAULT_INTERVAL = 2.0
+
+# Wait before trying again after the database refused a batch
+RETRY_INTERVAL = 5.0
+
+_STOP = object()
+
+
+class RecordWriter:
+    # Initilize the writer around a storage and start its thread, results left
+    # in the spool by an earlier run are stored first
+    def __init__(self, storage, spool_path=DEFAULT_SPOOL, batch_size=DEFAULT_BATCH_SIZE,
+                 interval=DEFAULT_INTERVAL):
+        self.storage = storage
+        self.spool_path = spool_path
+        self.batch_size = batch_size
+        self.interval = interval
+        self.queue = queue.Queue()
+        self.pending = self._read_spool()
+        self.deadline = time.monotonic() if self.pending else None
+        self.stats = {"submitted": 0, "written": 0, "batches": 0, "failed": 0}
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        atexit.register(self.close)
+
+    # Return the writer counters
+    def get_stats(self):
+        return dict(self.stats, pending=len(self.pending) + self.queue.qsize())
+
+    # Queues the result of a game, never blocks
+    def submit(self, username, win):
+        self.stats["submitted"] += 1
+        self.queue.put((username, bool(win)))
+
+    # Stores everything queued so far and returns whether the database took it,
+    # waiting at most timeout seconds
+    def flush(self, timeout=None):
+        done = threading.Event()
+        if not self.thread.is_alive():
+            return not self.pending
+        self.queue.put(done)
+        return done.wait(timeout) and not self.pending
+
+    # Stores what is left and stops the thread, results the database refused stay in the spool
+    def close(self, timeout=None):
+        if self.thread.is_alive():
+            self.queue.put(_STOP)
+            self.thread.join(timeout)
+        atexit.unregister(self.close)
+
+    def _run(self):
+        while True:
+            wait = None if self.deadline is None else max(0.0, self.deadline - time.monotonic())
+            try:
+                items = [self.queue.get(timeout=wait)]
+            except queue.Empty:
+                items = []
+            # Everything else already queued joins the same spool write
+            while True:
+                try:
+                    items.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            records = [item for item in items if isinstance(item, tuple)]
+            if records:
+                self._append_spool(records)
+                if not self.pending:
+                    self.deadline = time.monotonic() + self.interval
+                self.pending.extend(records)
+
+            events = [item for item in items if isinstance(item, threading.Event)]
+            stop = _STOP in items
+            if self.pending and (events or stop or len(self.pending) >= self.batch_size
+                                 or time.monotonic() >= self.deadline):
+                self._write()
+            for event in events:
+                event.set()
+            if stop:
+                return
+
+    # Stores the pending results a batch at a time, keeping whatever wasn't stored
+    def _write(self):
+        while self.pending:
+            batch = self.pending[:self.batch_size]
+            if not self.storage.create_records(batch):
+                self.stats["failed"] += 1
+                self.deadline = time.monotonic() + RETRY_INTERVAL
+                break
+            del self.pending[:len(batch)]
+            self.stats["written"] += len(batch)
+            self.stats["batches"] += 1
+        else:
+            self.deadline = None
+        self._rewrite_spool()
+
+    def _read_spool(self):
+        if not os.path.exists(self.spool_path):
+            return []
+        records = []
+        with open(self.spool_path) as spool:
+            for line in spool:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A line cut short by a crash in the middle of a write
+                    continue
+                records.append((record["username"], record["win"]))
+        return records
+
+    def _append_spool(self, records):
+        with open(self.spool_path, "a") as spool:
+            for username, win in records:
+                spool.write(json.dumps({"username": username, "win": win}) + "\n")
+            spool.flush()
+            os.fsync(spool.fileno())
+
+    # Replaces the spool with the results still pending, the new file is
+    # written aside first so a crash leaves either the old or the new one
+    def _rewrite_spool(self):
+        if not self.pending:
+            if os.path.exists(self.spool_path):
+                os.remove(self.spool_path)
+            return
+        temporary = self.spool_path + ".tmp"
+        with open(temporary, "w") as spool:
+            for username, win in self.pending:
+                spool.write(json.dumps({"username": username, "win": win}) + "\n")
+            spool.flush()
+            os.fsync(spool.fileno())
+        os.replace(temporary, self.spool_path)
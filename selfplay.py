@@ -0,0 +1,123 @@
+# Headless engine-vs-engine games spread over a process pool
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+from ai import AI
+from board import Board, get_starting_pieces
+from book import OpeningBook
+from geometry import ROW
+
+
+DEFAULT_OUTPUT = "selfplay.jsonl"
+
+# A game is drawn after this many plies without a capture or a man moving
+NO_PROGRESS_PLIES = 80
+
+
+# Plays one game and returns its record, the first plies are random so games differ
+def play_game(game_number, seed, depth, time_limit, random_plies, max_plies, book_path=None,
+              weights_path=None):
+    generator = random.Random(seed)
+    board = Board(get_starting_pieces(), 'W')
+    book = OpeningBook(book_path) if book_path else None
+    engines = {'W': AI('W', max_depth=depth, time_limit=time_limit, book=book, weights=weights_path),
+               'B': AI('B', max_depth=depth, time_limit=time_limit, book=book, weights=weights_path)}
+
+    moves = []
+    nodes = 0
+    quiet_plies = 0
+    result = "draw"
+    start = time.perf_counter()
+
+    while len(moves) < max_plies:
+        color = board.get_turn()
+        legal_moves = board.get_legal_moves(color)
+        if len(legal_moves) == 0:
+            result = 'B' if color == 'W' else 'W'
+            break
+
+        if len(moves) < random_plies:
+            move = generator.choice(legal_moves)
+        else:
+            engine = engines[color]
+            score, move = engine.search(board)
+            nodes += engine.nodes
+
+        is_man = not (board.get_king_mask() >> move[0]) & 1
+        board.make_move(move)
+        moves.append(list(move))
+
+        if is_man or abs(ROW[move[0]] - ROW[move[1]]) == 2:
+            quiet_plies = 0
+        else:
+            quiet_plies += 1
+            if quiet_plies >= NO_PROGRESS_PLIES:
+                break
+
+    if book is not None:
+        book.close()
+    return {
+        "game": game_number,
+        "seed": seed,
+        "result": result,
+        "plies": len(moves),
+        "nodes": nodes,
+        "seconds": round(time.perf_counter() - start, 3),
+        "moves": moves,
+    }
+
+
+# Pool entry point, takes its arguments as one tuple
+def _play_game(arguments):
+    return play_game(*arguments)
+
+
+# Plays the games on `workers` processes and writes one JSON line per game as they finish
+def run(games, workers, depth, time_limit, random_plies, max_plies, output, seed=0, book_path=None,
+        weights_path=None, report=print):
+    jobs = [(number, seed + number, depth, time_limit, random_plies, max_plies, book_path, weights_path)
+            for number in range(games)]
+    results = {"W": 0, "B": 0, "draw": 0}
+    nodes = 0
+
+    start = time.perf_counter()
+    with open(output, "w") as log, multiprocessing.Pool(processes=workers) as pool:
+        for record in pool.imap_unordered(_play_game, jobs):
+            log.write(json.dumps(record) + "\n")
+            log.flush()
+            results[record["result"]] += 1
+            nodes += record["nodes"]
+    elapsed = time.perf_counter() - start
+
+    report(f"{games} games on {workers} workers in {elapsed:.2f}s: "
+           f"{games / elapsed:.2f} games/s, {nodes / elapsed:.0f} nodes/s")
+    report(f"white {results['W']}, black {results['B']}, draws {results['draw']}")
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Play engine-vs-engine games without a display.")
+    parser.add_argument("--games", type=int, default=os.cpu_count())
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--depth", type=int, default=6)
+    parser.add_argument("--time-limit", type=float, default=1.0)
+    parser.add_argument("--random-plies", type=int, default=4)
+    parser.add_argument("--max-plies", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--book", help="opening book file built by book.py")
+    parser.add_argument("--weights", help="evaluation weights file written by tuner.py")
+    args = parser.parse_args(argv)
+
+    run(args.games, args.workers, args.depth, args.time_limit, args.random_plies,
+        args.max_plies, args.output, args.seed, args.book, args.weights)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
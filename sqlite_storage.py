@@ -0,0 +1,114 @@
+# Users and game records kept in a local SQLite file
+#
+# Needs no server, so local installs and the tests run the whole account and
+# record flow on it. The file is opened in WAL mode, which lets readers carry
+# on while a game is being recorded. Every statement is a constant string with
+# ? parameters, so each connection prepares it once and reuses it from its
+# statement cache afterwards.
+from __future__ import annotations
+import sqlite3
+
+from pool import ConnectionPool, PoolTimeout, DEFAULT_SIZE
+from storage import Storage
+
+DEFAULT_PATH = "checkers.db"
+
+# Seconds a writer waits for another one to finish
+BUSY_TIMEOUT = 5.0
+
+SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS users (
+           username TEXT PRIMARY KEY,
+           salt TEXT NOT NULL,
+           hash TEXT NOT NULL
+       )""",
+    """CREATE TABLE IF NOT EXISTS records (
+           id INTEGER PRIMARY KEY,
+           username TEXT NOT NULL,
+           win INTEGER NOT NULL,
+           played_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+       )""",
+    "CREATE INDEX IF NOT EXISTS records_username ON records (username)",
+)
+
+SELECT_USER = "SELECT username, salt, hash FROM users WHERE username = ?"
+INSERT_USER = "INSERT INTO users (username, salt, hash) VALUES (?, ?, ?)"
+INSERT_RECORD = "INSERT INTO records (username, win) VALUES (?, ?)"
+SELECT_STATS = "SELECT COUNT(*), COALESCE(SUM(win), 0) FROM records WHERE username = ?"
+
+
+class SQLiteStorage(Storage):
+    # Initilize the storage, creating the file and its tables when needed.
+    # An in-memory database only exists on one connection, so it gets a pool of one.
+    def __init__(self, path=DEFAULT_PATH, pool_size=DEFAULT_SIZE):
+        self.path = path
+        if path == ":memory:":
+            pool_size = 1
+        self.pool = ConnectionPool(self.connect, pool_size)
+        with self.pool.connection() as conn, conn:
+            for statement in SCHEMA:
+                conn.execute(statement)
+
+    # Opens a connection to the file, pooled connections move between threads
+    def connect(self):
+        conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        # With WAL a commit is still atomic when it isn't synced straight away
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    # Closes the pooled connections
+    def close(self):
+        self.pool.close()
+
+    # Returns user from the file
+    def get_user(self, username: str) -> dict | None:
+        if not username:
+            return None
+        try:
+            with self.pool.connection() as conn:
+                row = conn.execute(SELECT_USER, (username,)).fetchone()
+                return dict(row) if row else None
+        except (sqlite3.Error, PoolTimeout) as e:
+            print(f"[DB] get_user Error: {e}")
+            return None
+
+    # Stores a new user into the file
+    def add_user(self, username: str, salt: str, hash: str) -> bool:
+        try:
+            with self.pool.connection() as conn, conn:
+                conn.execute(INSERT_USER, (username, salt, hash))
+            return True
+        except (sqlite3.Error, PoolTimeout) as e:
+            print("Failed to create user:", e)
+            return False
+
+    def create_record(self, username: str, win: bool) -> bool:
+        try:
+            with self.pool.connection() as conn, conn:
+                conn.execute(INSERT_RECORD, (username, int(win)))
+            return True
+        except (sqlite3.Error, PoolTimeout) as e:
+            print("Failed to create record:", e)
+            return False
+
+    # Stores many (username, win) results in one transaction
+    def create_records(self, records) -> bool:
+        try:
+            with self.pool.connection() as conn, conn:
+                conn.executemany(INSERT_RECORD, [(username, int(win)) for username, win in records])
+            return True
+        except (sqlite3.Error, PoolTimeout) as e:
+            print("Failed to create records:", e)
+            return False
+
+    # Returns the games played and won by a user
+    def get_stats(self, username: str) -> dict | None:
+        try:
+            with self.pool.connection() as conn:
+                games, wins = conn.execute(SELECT_STATS, (username,)).fetchone()
+                return {"games": games, "wins": wins, "losses": games - wins}
+        except (sqlite3.Error, PoolTimeout) as e:
+            print(f"[DB] get_stats Error: {e}")
+            return None
@@ -0,0 +1,79 @@
+# Interface of the places users and game records are kept in
+#
+# db.Database keeps them in MySQL and sqlite_storage.SQLiteStorage in a local
+# SQLite file. Both hash passwords the same way, so they are interchangeable.
+# bcrypt is only imported when a password is hashed or checked, records and
+# stats work without it.
+from __future__ import annotations
+from abc import ABC, abstractmethod
+
+
+class Storage(ABC):
+    # Returns user from the storage, a dict with username, salt and hash
+    @abstractmethod
+    def get_user(self, username: str) -> dict | None:
+        pass
+
+    # Stores a user whose password is already hashed
+    @abstractmethod
+    def add_user(self, username: str, salt: str, hash: str) -> bool:
+        pass
+
+    # Stores the result of a finished game
+    @abstractmethod
+    def create_record(self, username: str, win: bool) -> bool:
+        pass
+
+    # Stores many (username, win) results in one transaction, the default
+    # stores them one by one
+    def create_records(self, records) -> bool:
+        return all(self.create_record(username, win) for username, win in records)
+
+    # Returns {"games", "wins", "losses"} of a user, or None when it can't be read
+    @abstractmethod
+    def get_stats(self, username: str) -> dict | None:
+        pass
+
+    # Releases the connections
+    def close(self):
+        pass
+
+    @staticmethod
+    # Helper method for encryption
+    def _to_bytes(x) -> bytes:
+        if isinstance(x, (bytes, bytearray)):
+            return bytes(x)
+        return str(x).encode("utf-8")
+
+    @staticmethod
+    # Helper method for encryption
+    def _looks_like_bcrypt(h: bytes) -> bool:
+        return h.startswith(b"$2a$") or h.startswith(b"$2b$") or h.startswith(b"$2y$")
+
+    # Creates a new user and stores it
+    def create_user(self, username: str, password: str) -> bool:
+        import bcrypt
+        salt_bytes = bcrypt.gensalt()
+        hash_bytes = bcrypt.hashpw(password.encode("utf-8"), salt_bytes)
+        return self.add_user(username, salt_bytes.decode("utf-8"), hash_bytes.decode("utf-8"))
+
+    # Retrieves user and login details from storage, and tests if it matches.
+    # A user already fetched can be passed in to save looking it up again.
+    def correct_password(self, username: str, password: str, user: dict | None = None) -> bool:
+        if user is None:
+            user = self.get_user(username)
+        import bcrypt
+        stored_hash = user.get("hash")
+        stored_hash_b = self._to_bytes(stored_hash)
+        ok = bcrypt.checkpw(password.encode("utf-8"), stored_hash_b)
+        return not ok
+
+    # Returns the percentage of games a user won, 0.0 before any game and
+    # False when the records can't be read
+    def get_record(self, username: str):
+        stats = self.get_stats(username)
+        if stats is None:
+            return False
+        if not stats["games"]:
+            return 0.0
+        return round(100.0 * stats["wins"] / stats["games"], 2)
@@ -0,0 +1,349 @@
+# Endgame tablebases: the exact result of every position with few pieces
+#
+# Positions are stored from the side to move, turned so that it moves up the
+# board, which makes "white to move" and "black to move" the same table. A
+# position belongs to the table of its material, the number of men and kings
+# of the side to move and of the other side, and its index there is a perfect
+# hash of the squares: each group of pieces is ranked among the squares the
+# previous groups left free. Every table is a .wdl file holding the result in
+# 2 bits per position and a .dtw file with the number of plies to the end of
+# the game, both written by a retrograde solver working from the smallest
+# material up.
+import argparse
+import os
+import sys
+import time
+from array import array
+from itertools import combinations
+from math import comb
+
+from board import Board
+from geometry import iter_squares
+from piece import Piece
+
+
+DRAW = 0
+WIN = 1
+LOSS = 2
+ILLEGAL = 3
+
+RESULT_NAMES = {DRAW: "draw", WIN: "win", LOSS: "loss", ILLEGAL: "illegal"}
+
+DEFAULT_DIRECTORY = "tablebase"
+DEFAULT_PIECES = 4
+MAX_PIECES = 6
+
+# Men of the side to move can't stand on the top row, the other side's men on the bottom row
+TOP_ROW = 0x0000000F
+BOTTOM_ROW = 0xF0000000
+
+
+# Turns a mask half a turn around, square n becomes square 31 - n
+def reverse_mask(mask):
+    return int(f"{mask:032b}"[::-1], 2)
+
+
+# Returns the name of a material, as used for its files
+def get_material_name(material):
+    return "".join(str(count) for count in material)
+
+
+# Returns every (own men, own kings, other men, other kings) material with both
+# sides on the board and at most `pieces` pieces, in the order they are solved:
+# captures and crowning only ever lead to a material that comes earlier
+def get_materials(pieces):
+    materials = []
+    for total in range(2, pieces + 1):
+        for own in range(1, total):
+            for own_men in range(own + 1):
+                for other_men in range(total - own + 1):
+                    materials.append((own_men, own - own_men, other_men, total - own - other_men))
+    materials.sort(key=lambda material: (sum(material), material[0] + material[2]))
+    return materials
+
+
+# Returns the number of indexes in the table of a material
+def get_table_size(material):
+    size = 1
+    free = 32
+    for count in material:
+        size *= comb(free, count)
+        free -= count
+    return size
+
+
+# Returns the index of a position in the table of its material
+def get_index(material, masks):
+    index = 0
+    used = 0
+    free = 32
+    for count, mask in zip(material, masks):
+        rank = 0
+        for place, square in enumerate(iter_squares(mask), 1):
+            rank += comb(square - (used & ((1 << square) - 1)).bit_count(), place)
+        index = index * comb(free, count) + rank
+        used |= mask
+        free -= count
+    return index
+
+
+# Returns the material and the (own men, own kings, other men, other kings)
+# masks of a board, seen from the side to move
+def get_position(board, color):
+    other = 'B' if color == 'W' else 'W'
+    kings = board.get_king_mask()
+    own = board.get_color_mask(color)
+    opponent = board.get_color_mask(other)
+    masks = (own & ~kings, own & kings, opponent & ~kings, opponent & kings)
+    if color != board.get_color_up():
+        masks = tuple(reverse_mask(mask) for mask in masks)
+    return tuple(mask.bit_count() for mask in masks), masks
+
+
+# Yields every placement of a material as masks, the side to move moving up
+def _placements(material, used=0, masks=()):
+    if len(masks) == len(material):
+        yield masks
+        return
+    count = material[len(masks)]
+    free = [square for square in range(32) if not (used >> square) & 1]
+    for squares in combinations(free, count):
+        mask = 0
+        for square in squares:
+            mask |= 1 << square
+        yield from _placements(material, used | mask, masks + (mask,))
+
+
+# Returns the positions reachable in one move, each seen from the side moving next
+def _successors(masks):
+    own_men, own_kings, other_men, other_kings = masks
+    pieces = [Piece(f"{square}WN") for square in iter_squares(own_men)]
+    pieces += [Piece(f"{square}WY") for square in iter_squares(own_kings)]
+    pieces += [Piece(f"{square}BN") for square in iter_squares(other_men)]
+    pieces += [Piece(f"{square}BY") for square in iter_squares(other_kings)]
+    board = Board(pieces, 'W', 'W')
+
+    successors = []
+    for move in board.get_legal_moves('W'):
+        token = board.make_move(move)
+        white = board.get_color_mask('W')
+        black = board.get_color_mask('B')
+        kings = board.get_king_mask()
+        board.unmake_move(token)
+        successors.append((reverse_mask(black & ~kings), reverse_mask(black & kings),
+                           reverse_mask(white & ~kings), reverse_mask(white & kings)))
+    return successors
+
+
+# Solves a material together with its mirror (the same pieces with the other
+# side to move), as quiet moves go back and forth between the two. Results of
+# smaller materials are looked up in `tables`, which receives the new ones.
+def _solve(group, tables):
+    offsets = {}
+    total = 0
+    for material in group:
+        offsets[material] = total
+        total += get_table_size(material)
+
+    results = bytearray(total)
+    distances = array("H", bytes(2 * total))
+    successors = [None] * total
+    predecessors = [[] for _ in range(total)]
+    # Per position: shortest loss and longest win among the successors in
+    # smaller materials, and whether one of them is a draw
+    outside_loss = {}
+    outside_win = {}
+    outside_draw = set()
+    # Positions to look at once the solver reaches a distance, because of a successor outside the group
+    waiting = {}
+    resolved = []
+
+    for material in group:
+        offset = offsets[material]
+        for masks in _placements(material):
+            position = offset + get_index(material, masks)
+            if masks[0] & TOP_ROW or masks[2] & BOTTOM_ROW:
+                results[position] = ILLEGAL
+                continue
+
+            inside = []
+            for next_masks in _successors(masks):
+                next_material = tuple(mask.bit_count() for mask in next_masks)
+                if next_material[0] + next_material[1] == 0:
+                    # The move took the last piece, the other side has lost
+                    result, distance = LOSS, 0
+                elif next_material in offsets:
+                    inside.append(offsets[next_material] + get_index(next_material, next_masks))
+                    continue
+                else:
+                    next_results, next_distances = tables[next_material]
+                    next_position = get_index(next_material, next_masks)
+                    result, distance = next_results[next_position], next_distances[next_position]
+
+                if result == LOSS:
+                    outside_loss[position] = min(outside_loss.get(position, distance), distance)
+                elif result == WIN:
+                    outside_win[position] = max(outside_win.get(position, distance), distance)
+                else:
+                    outside_draw.add(position)
+
+            successors[position] = inside
+            for next_position in inside:
+                predecessors[next_position].append(position)
+            if position in outside_loss:
+                waiting.setdefault(outside_loss[position] + 1, []).append(position)
+            if position in outside_win:
+                waiting.setdefault(outside_win[position] + 1, []).append(position)
+            if not inside and position not in outside_loss and position not in outside_win \
+                    and position not in outside_draw:
+                # No legal move, the side to move has lost
+                results[position] = LOSS
+                resolved.append(position)
+
+    # A position is won in n plies when a move leads to a loss in n - 1, and
+    # lost in n when every move leads to a win, the longest one in n - 1.
+    # Looking at distances in order keeps every distance the shortest win or
+    # the longest loss; whatever is never decided is a draw.
+    distance = 0
+    while resolved or any(key > distance for key in waiting):
+        distance += 1
+        candidates = set(waiting.pop(distance, ()))
+        for position in resolved:
+            candidates.update(predecessors[position])
+
+        resolved = []
+        for position in candidates:
+            if results[position] != DRAW:
+                continue
+            inside = successors[position]
+            if outside_loss.get(position) == distance - 1 or any(
+                    results[next_position] == LOSS and distances[next_position] == distance - 1
+                    for next_position in inside):
+                results[position] = WIN
+            elif position in outside_draw or position in outside_loss or any(
+                    results[next_position] != WIN for next_position in inside):
+                continue
+            elif max([outside_win.get(position, -1)] + [distances[next_position]
+                                                        for next_position in inside]) == distance - 1:
+                results[position] = LOSS
+            else:
+                continue
+            distances[position] = distance
+            resolved.append(position)
+
+    for material in group:
+        start = offsets[material]
+        end = start + get_table_size(material)
+        tables[material] = (results[start:end], distances[start:end])
+
+
+# Packs results four to a byte
+def pack_results(results):
+    packed = bytearray((len(results) + 3) // 4)
+    for position, result in enumerate(results):
+        packed[position >> 2] |= result << ((position & 3) * 2)
+    return packed
+
+
+# Solves every material up to `pieces` pieces and writes the tables to a directory
+def generate(pieces=DEFAULT_PIECES, directory=DEFAULT_DIRECTORY, report=print):
+    if not 2 <= pieces <= MAX_PIECES:
+        raise ValueError(f"tablebases cover 2 to {MAX_PIECES} pieces")
+    os.makedirs(directory, exist_ok=True)
+
+    tables = {}
+    for material in get_materials(pieces):
+        if material in tables:
+            continue
+        mirror = material[2:] + material[:2]
+        group = [material] if mirror == material else [material, mirror]
+
+        start = time.perf_counter()
+        _solve(group, tables)
+        for solved in group:
+            results, distances = tables[solved]
+            name = os.path.join(directory, get_material_name(solved))
+            with open(name + ".wdl", "wb") as wdl_file:
+                wdl_file.write(pack_results(results))
+            if sys.byteorder == "big":
+                distances = array("H", distances)
+                distances.byteswap()
+            with open(name + ".dtw", "wb") as dtw_file:
+                dtw_file.write(distances.tobytes())
+
+        counts = {result: 0 for result in RESULT_NAMES}
+        for solved in group:
+            for result in tables[solved][0]:
+                counts[result] += 1
+        report(f"{' '.join(get_material_name(solved) for solved in group):9s} "
+               f"{time.perf_counter() - start:8.2f}s  " +
+               ", ".join(f"{counts[result]} {RESULT_NAMES[result]}" for result in RESULT_NAMES))
+    return tables
+
+
+class EndgameTablebase:
+    # Finds the tables in a directory, each one is read the first time a position needs it
+    def __init__(self, directory=DEFAULT_DIRECTORY):
+        self.directory = directory
+        self.tables = {}
+        self.max_pieces = 0
+        for file_name in os.listdir(directory):
+            name, extension = os.path.splitext(file_name)
+            if extension == ".wdl" and len(name) == 4 and name.isdigit():
+                self.max_pieces = max(self.max_pieces, sum(int(count) for count in name))
+
+    # Return the largest number of pieces the tables cover
+    def get_max_pieces(self):
+        return self.max_pieces
+
+    # Returns the (results, distances) of a material, or None when there is no table for it
+    def get_table(self, material):
+        if material not in self.tables:
+            name = os.path.join(self.directory, get_material_name(material))
+            if os.path.exists(name + ".wdl"):
+                with open(name + ".wdl", "rb") as wdl_file:
+                    results = wdl_file.read()
+                distances = array("H")
+                with open(name + ".dtw", "rb") as dtw_file:
+                    distances.frombytes(dtw_file.read())
+                if sys.byteorder == "big":
+                    distances.byteswap()
+                self.tables[material] = (results, distances)
+            else:
+                self.tables[material] = None
+        return self.tables[material]
+
+    # Returns (result, plies to the end of the game) for the side to move, or
+    # None when the position isn't covered or can't happen in a game (a man on
+    # the row it crowns on). The color to move defaults to the board's turn.
+    def probe(self, board, color=None):
+        if board.get_occupied_mask().bit_count() > self.max_pieces:
+            return None
+        material, masks = get_position(board, color or board.get_turn())
+        table = self.get_table(material)
+        if table is None:
+            return None
+
+        results, distances = table
+        index = get_index(material, masks)
+        result = (results[index >> 2] >> ((index & 3) * 2)) & 3
+        if result == ILLEGAL:
+            return None
+        return result, distances[index]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Generate endgame tablebases by retrograde analysis.")
+    parser.add_argument("--pieces", type=int, default=DEFAULT_PIECES)
+    parser.add_argument("--directory", default=DEFAULT_DIRECTORY)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    generate(args.pieces, args.directory)
+    print(f"tables up to {args.pieces} pieces written to {args.directory} "
+          f"in {time.perf_counter() - start:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
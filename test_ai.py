@@ -1,8 +1,10 @@
 import sys
 sys.path.append('..')
+import time
 from piece import Piece
 from board import Board
-from ai import AI
+from ai import AI, WIN_SCORE
+from lazy_smp import ParallelAI
 
 def test_minimax_maximize():
     # minimax() returns the maximum value possible
@@ -16,10 +18,28 @@ def test_minimax_minimize():
     test_ai = AI('B')
     test_board = Board([Piece('9WN'), Piece('17BN'), Piece('21BN')], 'B')
     assert test_ai.minimax(test_board, False, 1, 'B') == 1
-    assert test_ai.minimax(test_board, False, 2, 'B') == 0
+    # After 17-13 white eats 13 and 21 with one double jump, a multi-jump being a single move.
+    assert test_ai.minimax(test_board, False, 2, 'B') == -WIN_SCORE
 
 def test_get_move():
     # get_move() should return the move with the maximum value
     test_ai = AI('B')
     test_board = Board([Piece('9WN'), Piece('17BN'), Piece('21BN')], 'B')
-    assert test_ai.get_move(test_board) in [{"position_from": "17", "position_to": "13"}, {"position_from": "21", "position_to": "18"}]
\ No newline at end of file
+    assert test_ai.get_move(test_board) in [{"position_from": "17", "position_to": "13"}, {"position_from": "21", "position_to": "18"}]
+
+def test_parallel_get_move():
+    # Workers sharing one table agree on a sensible move.
+    test_board = Board([Piece('9WN'), Piece('17BN'), Piece('21BN')], 'B')
+    with ParallelAI('B', workers=2, time_limit=5, table_entries=1024) as test_ai:
+        assert test_ai.get_move(test_board) in [{"position_from": "17", "position_to": "13"}, {"position_from": "21", "position_to": "18"}]
+        assert test_ai.completed_depth >= 1
+
+def test_parallel_search_survives_a_dead_worker():
+    # A killed worker never reports, the search still returns within its time.
+    test_board = Board([Piece('9WN'), Piece('17BN'), Piece('21BN')], 'B')
+    with ParallelAI('B', workers=2, max_depth=30, time_limit=0.3, table_entries=1024) as test_ai:
+        test_ai.processes[1].kill()
+        test_ai.processes[1].join()
+        start = time.perf_counter()
+        assert test_ai.get_move(test_board) in [{"position_from": "17", "position_to": "13"}, {"position_from": "21", "position_to": "18"}]
+        assert time.perf_counter() - start < 5
@@ -36,4 +36,68 @@ def test_get_pieces_by_coords():
     # This method should receive (row, column) pairs and return the pieces on these coordinates.
     test_piece = Piece('8WN')
     test_board = Board([test_piece], 'W')
-    assert test_board.get_pieces_by_coords((2, 0), (3, 0)) == [test_piece, None]
\ No newline at end of file
+    assert test_board.get_pieces_by_coords((2, 0), (3, 0)) == [test_piece, None]
+
+def test_move_piece_eats():
+    # Jumping over an opponent removes it from the board and clears its square.
+    test_piece = Piece('13WN')
+    test_board = Board([test_piece, Piece('9BN')], 'W')
+    test_board.move_piece(1, 4)
+    assert test_piece.get_position() == '4'
+    assert test_piece.get_has_eaten() == True
+    assert test_board.has_piece(9) == False
+    assert test_board.get_pieces() == [test_piece]
+
+def test_get_winner():
+    # The winner is the only color left on the board.
+    assert Board([Piece('4WN'), Piece('8WY')], 'W').get_winner() == 'W'
+    assert Board([Piece('4WN'), Piece('8BN')], 'W').get_winner() is None
+
+def test_generate_moves():
+    # All moves of a color come back at once, and a capture anywhere forces the side to eat.
+    test_board = Board([Piece('18WN'), Piece('8WN'), Piece('30BN')], 'W')
+    moves = test_board.generate_moves('W')
+    assert sorted(moves["quiet"]) == [(8, 4), (18, 13), (18, 14)]
+    assert moves["captures"] == []
+    assert moves["must_eat"] == False
+
+    test_board = Board([Piece('13WN'), Piece('9BN'), Piece('31WN')], 'W')
+    moves = test_board.generate_moves('W')
+    assert moves["captures"] == [(13, 4)]
+    assert moves["must_eat"] == True
+
+def test_hash_is_incremental():
+    # The hash kept up to date by move_piece matches the hash of the same position built from scratch.
+    test_board = Board([Piece('13WN'), Piece('9BN'), Piece('2BN')], 'W')
+    test_board.move_piece(2, 4)
+    assert test_board.get_turn() == 'B'
+    assert test_board.get_hash() == Board([Piece('4WN'), Piece('2BN')], 'W', 'B').get_hash()
+
+def test_make_unmake_move():
+    # unmake_move puts back the moved piece, its king status, the eaten piece and the hash.
+    mover = Piece('9WN')
+    eaten = Piece('5BY')
+    test_board = Board([mover, eaten, Piece('20BN')], 'W')
+    start_hash = test_board.get_hash()
+
+    token = test_board.make_move((9, 2))
+    assert mover.get_position() == '2' and mover.is_king() and mover.get_has_eaten()
+    assert test_board.has_piece(5) == False
+    assert test_board.get_turn() == 'B'
+
+    test_board.unmake_move(token)
+    assert mover.get_name() == '9WN' and mover.get_has_eaten() == False
+    assert test_board.get_pieces() == [eaten, mover, test_board.get_piece_at(20)]
+    assert test_board.get_turn() == 'W'
+    assert test_board.get_hash() == start_hash
+
+def test_get_legal_moves_multi_jump():
+    # A capture is the whole jump sequence, and being crowned ends it.
+    test_board = Board([Piece('9WN'), Piece('13BN'), Piece('21BN')], 'B')
+    assert test_board.get_legal_moves('W') == [(9, 18, 25)]
+
+    # The new king on 2 could jump 6 but its turn is over.
+    test_board = Board([Piece('9WN'), Piece('5BN'), Piece('6BN')], 'W')
+    assert test_board.get_legal_moves('W') == [(9, 2)]
+    test_board.make_move((9, 2))
+    assert test_board.get_turn() == 'B'
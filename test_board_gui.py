@@ -0,0 +1,144 @@
+import sys
+sys.path.append('..')
+import os
+import random
+import pytest
+pygame = pytest.importorskip("pygame")
+from assets import ASSETS
+from board import Board, get_starting_pieces
+from board_gui import BoardGUI, get_square_at, SQUARE_RECTS, BACKGROUND_COLOR, BOARD_POSITION, SQUARE_DIST, BOARD_IMAGE, \
+    WHITE_PIECE_IMAGE, BLACK_PIECE_IMAGE, WHITE_KING_PIECE_IMAGE, BLACK_KING_PIECE_IMAGE, MOVE_MARK_IMAGE
+from game_control import GameControl
+from piece import Piece
+
+@pytest.fixture(autouse=True)
+def images(tmp_path):
+    # Plain colored stand-ins for the game's images, loaded from a temporary directory.
+    sizes = {BOARD_IMAGE: (464, 464), WHITE_PIECE_IMAGE: (41, 41), BLACK_PIECE_IMAGE: (41, 41),
+             WHITE_KING_PIECE_IMAGE: (41, 41), BLACK_KING_PIECE_IMAGE: (41, 41), MOVE_MARK_IMAGE: (44, 44)}
+    for index, (name, size) in enumerate(sizes.items()):
+        surface = pygame.Surface(size)
+        surface.fill((40 * index, 255 - 40 * index, 100))
+        pygame.image.save(surface, os.path.join(tmp_path, name))
+    directory = ASSETS.directory
+    ASSETS.directory = str(tmp_path)
+    ASSETS.originals = {}
+    ASSETS.clear()
+    yield
+    ASSETS.directory = directory
+    ASSETS.originals = {}
+    ASSETS.clear()
+
+def game_on(board):
+    game = GameControl(player_color=board.get_turn())
+    game.board = board
+    game.board_draw = BoardGUI(board)
+    return game
+
+def test_multi_jump_to_crowning():
+    # White jumps 12 and 4 in one move and is crowned on 0.
+    game = game_on(Board([Piece('16WN'), Piece('12BN'), Piece('4BN'), Piece('31BN')], 'W'))
+    move = (16, 9, 0)
+    assert move in game.board.get_legal_moves('W')
+    game.board.make_move(move)
+    game.show_move(move)
+    assert game.board_draw.pieces == game.board_draw.get_piece_properties(game.board)
+    assert game.board_draw.pieces[0]["is_king"]
+    assert set(game.board_draw.pieces) == {0, 31}
+
+def test_jump_played_hop_by_hop():
+    # A player drags the piece one jump at a time.
+    game = game_on(Board([Piece('16WN'), Piece('12BN'), Piece('4BN'), Piece('31BN')], 'W'))
+    for hop in ((16, 9), (9, 0)):
+        game.board.move_piece_at(*hop)
+        game.show_move(hop)
+        assert game.board_draw.pieces == game.board_draw.get_piece_properties(game.board)
+
+def test_patched_pieces_match_a_rebuild():
+    # Random games: after every move the patched pieces equal the ones built from the board.
+    generator = random.Random(3)
+    multi_jumps = crownings = 0
+    for _ in range(20):
+        game = GameControl(player_color='W')
+        board = game.board
+        for _ in range(200):
+            moves = board.get_legal_moves(board.get_turn())
+            if not moves:
+                break
+            move = generator.choice(moves)
+            was_king = board.get_piece_at(move[0]).is_king()
+            board.make_move(move)
+            game.show_move(move)
+            multi_jumps += len(move) > 2
+            crownings += board.get_piece_at(move[-1]).is_king() and not was_king
+            assert game.board_draw.pieces == game.board_draw.get_piece_properties(board)
+    assert multi_jumps and crownings
+
+def test_get_square_at():
+    # The center of every square maps back to it, light squares and the margin map to -1.
+    for square, rect in enumerate(SQUARE_RECTS):
+        assert get_square_at(rect.center) == square
+        assert get_square_at(rect.topleft) == square
+    # Row 0 column 1 is light
+    assert get_square_at((BOARD_POSITION[0] + SQUARE_DIST + 1, BOARD_POSITION[1] + 1)) == -1
+    assert get_square_at((BOARD_POSITION[0] - 1, 200)) == -1
+    edge = BOARD_POSITION[0] + 8 * SQUARE_DIST
+    # The last pixel of the grid is on square 31 (row 7 column 7), the next one is off it
+    assert get_square_at((edge - 1, edge - 1)) == 31
+    assert get_square_at((edge, 200)) == -1 and get_square_at((200, edge)) == -1
+
+def test_get_piece_on_mouse_and_drop_square():
+    board_draw = BoardGUI(Board(get_starting_pieces(), 'W'))
+    assert board_draw.get_piece_on_mouse(SQUARE_RECTS[22].center) == 22
+    assert board_draw.get_piece_on_mouse(SQUARE_RECTS[17].center) is None
+    assert board_draw.get_piece_on_mouse((5, 5)) is None
+    board_draw.set_move_marks([17, 18])
+    # A piece is dropped on the square under its center, only when that square is marked.
+    held = SQUARE_RECTS[18].move(10, -12)
+    assert board_draw.get_drop_square(held) == 18
+    assert board_draw.get_drop_square(SQUARE_RECTS[21]) is None
+    assert board_draw.get_drop_square(held.move(0, 3 * SQUARE_DIST)) is None
+
+def test_dragging_off_the_board_matches_a_full_redraw(monkeypatch):
+    # A held piece dragged past the board edge, even partly out of the window, is drawn
+    # and wiped the same as a redraw of the whole window.
+    import held_piece
+    mouse = [SQUARE_RECTS[22].center]
+    monkeypatch.setattr(held_piece, "get_mouse_pos", lambda: mouse[0])
+    game = GameControl(player_color='W')
+    window = pygame.Surface((700, 500))
+    window.fill(BACKGROUND_COLOR)
+    game.draw_screen(window)
+
+    def assert_matches_full_redraw():
+        game.draw_changes(window)
+        full = pygame.Surface((700, 500))
+        full.fill(BACKGROUND_COLOR)
+        game.draw_screen(full)
+        assert pygame.image.tobytes(window, "RGB") == pygame.image.tobytes(full, "RGB")
+
+    game.hold_piece(mouse[0])
+    assert_matches_full_redraw()
+    for position in ((480, 300), (560, 320), (690, 495), (30, 10), (5, 250), SQUARE_RECTS[17].center, (600, 100)):
+        mouse[0] = position
+        assert_matches_full_redraw()
+    game.release_piece()
+    assert_matches_full_redraw()
+    assert 22 in game.board_draw.pieces
+
+def test_computer_pieces_cant_be_held_while_it_thinks(monkeypatch):
+    # After white's move the computer plays black, its men can't be picked up meanwhile.
+    import held_piece
+    from ai import AI
+    mouse = [SQUARE_RECTS[22].center]
+    monkeypatch.setattr(held_piece, "get_mouse_pos", lambda: mouse[0])
+    game = GameControl(player_color='W', ai=AI('B', max_depth=30, time_limit=60), ponder=False)
+    game.hold_piece(mouse[0])
+    mouse[0] = SQUARE_RECTS[18].center
+    game.draw_changes(pygame.Surface((700, 500)))
+    game.release_piece()
+    assert game.is_computer_thinking()
+    game.hold_piece(SQUARE_RECTS[9].center)
+    assert game.held_piece is None
+    assert game.get_turn() == 'B'
+    game.close()
@@ -0,0 +1,34 @@
+import sys
+sys.path.append('..')
+from ai import AI
+from board import Board, get_starting_pieces
+from book import OpeningBook, build_book
+
+# Two games opening 22-18 and one opening 21-17, white wins both 22-18 games.
+GAMES = [
+    ([(22, 18), (9, 13)], 'W'),
+    ([(22, 18), (10, 14)], 'W'),
+    ([(21, 17), (9, 13)], 'B'),
+]
+
+def test_build_and_probe(tmp_path):
+    path = str(tmp_path / "book.bin")
+    assert build_book(GAMES, path, min_plays=1) == 5
+    board = Board(get_starting_pieces(), 'W')
+    with OpeningBook(path) as book:
+        assert sorted(book.probe(board.get_hash())) == [(21, 17, 1, 0, 0), (22, 18, 2, 2, 0)]
+        assert book.probe(12345) == []
+        assert book.get_move(board) == (22, 18)
+
+        # Moves played in fewer games than min_plays are left out.
+        assert build_book(GAMES, path + "2", min_plays=2) == 1
+
+def test_ai_plays_book_move(tmp_path):
+    path = str(tmp_path / "book.bin")
+    build_book(GAMES, path, min_plays=1)
+    board = Board(get_starting_pieces(), 'W')
+    board.make_move((22, 18))
+    with OpeningBook(path) as book:
+        engine = AI('B', max_depth=1, book=book)
+        assert engine.search(board) == (None, (9, 13))
+        assert engine.nodes == 0
@@ -0,0 +1,56 @@
+import sys
+sys.path.append('..')
+import pytest
+connector = pytest.importorskip("mysql.connector")
+from db import Database
+
+class DroppingConnection:
+    # Fails its first query with a lost connection, as if the server went away.
+    queries = []
+
+    def __init__(self, drops):
+        self.drops = drops
+
+    def cursor(self, dictionary=False):
+        return DroppingCursor(self)
+
+    def commit(self):
+        pass
+
+    def close(self):
+        pass
+
+class DroppingCursor:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+    def execute(self, query, params=()):
+        DroppingConnection.queries.append(query.split()[0])
+        if self.connection.drops:
+            raise connector.OperationalError("Lost connection to MySQL server during query")
+
+    def fetchone(self):
+        return (3, 2)
+
+    def close(self):
+        pass
+
+def database():
+    connections = iter([DroppingConnection(True), DroppingConnection(False)])
+    DroppingConnection.queries = []
+    return Database(connect=lambda: next(connections), pool_size=2)
+
+def test_reads_are_retried_on_a_new_connection():
+    assert database().get_stats("alice") == {"games": 3, "wins": 2, "losses": 1}
+    assert DroppingConnection.queries == ["SELECT", "SELECT"]
+
+def test_writes_are_not_retried():
+    # The server may have committed before the connection dropped, a retry could store the game twice.
+    assert database().create_record("alice", True) is False
+    assert DroppingConnection.queries == ["INSERT"]
@@ -0,0 +1,79 @@
+import sys
+sys.path.append('..')
+import random
+import pytest
+np = pytest.importorskip("numpy")
+from ai import AI
+from board import Board
+from evaluator import BatchEvaluator, compute_features, encode_board, TERMS
+from perft import get_position
+from piece import Piece
+
+def random_board(generator):
+    color_up = generator.choice('WB')
+    squares = generator.sample(range(32), generator.randint(2, 16))
+    pieces = []
+    for square in squares:
+        color = generator.choice('WB')
+        # Men never stand on the row they are crowned on
+        king = 'Y' if square // 4 == (0 if color == color_up else 7) else generator.choice('NNY')
+        pieces.append(Piece(str(square) + color + king))
+    return Board(pieces, color_up)
+
+def test_features_match_board():
+    # Each term counted square by square on the board gives the vectorized value.
+    generator = random.Random(3)
+    for _ in range(50):
+        board = random_board(generator)
+        features = compute_features(encode_board(board)[None, :])[0]
+
+        expected = dict.fromkeys(TERMS, 0)
+        for piece in board.get_pieces():
+            sign = 1 if piece.get_color() == 'W' else -1
+            row = piece.get_square() // 4
+            advanced = 7 - row if piece.get_color() == board.get_color_up() else row
+            expected["material"] += sign
+            if piece.is_king():
+                expected["kings"] += sign
+            else:
+                expected["advancement"] += sign * advanced
+                expected["back_rank"] += sign * (advanced == 0)
+        expected["mobility"] = (len(board.generate_moves('W')["quiet"])
+                                - len(board.generate_moves('B')["quiet"]))
+        assert dict(zip(TERMS, features.tolist())) == expected
+
+def test_default_weights_match_ai():
+    # Without positional weights the batch scores are the AI's own evaluation.
+    generator = random.Random(4)
+    boards = [random_board(generator) for _ in range(30)]
+    for color in 'WB':
+        engine = AI(color)
+        batched = AI(color, evaluator=BatchEvaluator())
+        for board in boards:
+            assert batched.evaluate(board) == engine.evaluate(board)
+
+def test_search_with_evaluator():
+    # Scoring leaves in batches finds the same move and score.
+    for name in ["opening", "multi-jump"]:
+        board = get_position(name)
+        color = board.get_turn()
+        assert AI(color, max_depth=4, time_limit=60, evaluator=BatchEvaluator()).search(board) == \
+            AI(color, max_depth=4, time_limit=60).search(board)
+
+def test_unknown_weight():
+    with pytest.raises(ValueError):
+        BatchEvaluator({"tempo": 1})
+
+def test_engine_loads_weights_file(tmp_path):
+    # The game's engine plays with the tuner's weights when the file exists, and the
+    # pondering helpers evaluate the same way.
+    from ai import get_weights_file
+    from evaluator import save_weights
+    from ponder import PonderingEngine
+    path = str(tmp_path / "weights.json")
+    assert get_weights_file(path) is None
+    save_weights(path, {"material": 1.0, "kings": 0.5, "mobility": 0.1})
+    engine = PonderingEngine(AI('B', weights=get_weights_file(path)))
+    assert engine.ai.evaluator.get_weights()["mobility"] == pytest.approx(0.1)
+    assert engine.ponder_ai.evaluator is engine.ai.evaluator
+    assert engine.predictor.evaluator is engine.ai.evaluator
@@ -0,0 +1,19 @@
+import sys
+sys.path.append('..')
+from geometry import NEIGHBORS, JUMPS, JUMPED, SQUARE_AT, ROW, COLUMN, UP_LEFT, DOWN_RIGHT
+
+def test_neighbors_and_jumps():
+    # Square 18 is on row 4, column 4. Stepping off the board gives -1.
+    assert (ROW[18], COLUMN[18]) == (4, 4)
+    assert NEIGHBORS[UP_LEFT][18] == 13
+    assert JUMPS[UP_LEFT][18] == 9
+    assert JUMPED[18][9] == 13
+    assert NEIGHBORS[UP_LEFT][4] == 0
+    assert JUMPS[UP_LEFT][4] == -1
+    assert NEIGHBORS[DOWN_RIGHT][31] == -1
+
+def test_square_at_matches_row_column():
+    # SQUARE_AT is the inverse of ROW and COLUMN on the dark squares only.
+    for square in range(32):
+        assert SQUARE_AT[ROW[square]][COLUMN[square]] == square
+    assert SQUARE_AT[0][1] == -1
@@ -0,0 +1,26 @@
+import sys
+sys.path.append('..')
+import os
+import subprocess
+
+def loaded_after_import(modules):
+    # Imports modules in a fresh interpreter and returns every module it ended up loading.
+    code = "import sys\n" + "".join(f"import {module}\n" for module in modules) + "print(' '.join(sys.modules))"
+    output = subprocess.run([sys.executable, "-c", code], cwd=os.path.dirname(os.path.abspath(__file__)),
+                            capture_output=True, text=True, check=True)
+    return set(output.stdout.split())
+
+def test_rules_and_engine_import_without_gui_or_db():
+    loaded = loaded_after_import(["board", "piece", "utils", "geometry", "ai", "perft", "selfplay", "book",
+                                  "tablebase", "lazy_smp", "ponder"])
+    assert "pygame" not in loaded
+    assert "numpy" not in loaded
+    assert "db" not in loaded and "mysql" not in loaded
+
+def test_user_manager_connects_lazily():
+    loaded = loaded_after_import(["user_manager"])
+    assert "db" not in loaded and "mysql" not in loaded and "bcrypt" not in loaded
+
+def test_sqlite_storage_imports_without_bcrypt():
+    loaded = loaded_after_import(["sqlite_storage", "record_writer"])
+    assert "bcrypt" not in loaded and "mysql" not in loaded
@@ -0,0 +1,46 @@
+import sys
+sys.path.append('..')
+from perft import POSITIONS, get_position, get_reference, perft
+
+def test_perft_reference_counts():
+    # Leaf counts match the reference numbers, the opening only up to a depth that runs quickly.
+    for name in POSITIONS:
+        board = get_position(name)
+        max_depth = 5 if name == "opening" else 6
+        for depth in range(1, max_depth + 1):
+            assert perft(board, depth) == get_reference(name, depth), (name, depth)
+
+def hop_by_hop_moves(board, color):
+    # Builds full moves one hop at a time from Piece.get_moves, independently of Board.get_legal_moves.
+    piece_moves = {piece.get_square(): piece.get_moves(board) for piece in board.get_pieces() if piece.get_color() == color}
+    must_eat = any(move["eats_piece"] for moves in piece_moves.values() for move in moves)
+    paths = []
+    for square, moves in piece_moves.items():
+        for move in moves:
+            if move["eats_piece"] != must_eat:
+                continue
+            pending = [(square, int(move["position"]))]
+            while pending:
+                path = pending.pop()
+                copy = board.copy()
+                for index in range(len(path) - 1):
+                    copy.move_piece_at(path[index], path[index + 1])
+                if copy.get_turn() != color:
+                    paths.append(path)
+                    continue
+                for next_move in copy.get_piece_at(path[-1]).get_moves(copy):
+                    pending.append(path + (int(next_move["position"]),))
+    return paths
+
+def test_legal_moves_match_hop_by_hop_moves():
+    # The mask based generator agrees with the per-piece moves on every position reached in two moves.
+    for name in POSITIONS:
+        board = get_position(name)
+        for move in board.get_legal_moves(board.get_turn()):
+            token = board.make_move(move)
+            for reply in board.get_legal_moves(board.get_turn()):
+                reply_token = board.make_move(reply)
+                color = board.get_turn()
+                assert sorted(board.get_legal_moves(color)) == sorted(hop_by_hop_moves(board, color))
+                board.unmake_move(reply_token)
+            board.unmake_move(token)
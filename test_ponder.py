@@ -0,0 +1,66 @@
+import sys
+sys.path.append('..')
+import time
+from ai import AI
+from board import Board, get_starting_pieces
+from ponder import PonderingEngine
+
+def wait_for(condition, timeout=10):
+    end = time.perf_counter() + timeout
+    while not condition():
+        assert time.perf_counter() < end
+        time.sleep(0.01)
+
+def ponder_on_opening(engine):
+    # White to move, the engine plays black and ponders on white's likely reply.
+    board = Board(get_starting_pieces(), 'W')
+    engine.start_pondering(board)
+    wait_for(lambda: engine.ponder_hash is not None)
+    replies = {}
+    for move in board.get_legal_moves('W'):
+        token = board.make_move(move)
+        replies[board.get_hash()] = move
+        board.unmake_move(token)
+    return board, replies[engine.ponder_hash], [move for move in replies.values()
+                                                if move != replies[engine.ponder_hash]][0]
+
+def test_ponder_hit_and_miss():
+    engine = PonderingEngine(AI('B', max_depth=4, time_limit=5))
+    board, predicted, other = ponder_on_opening(engine)
+    board.make_move(predicted)
+    engine.submit(board)
+    wait_for(lambda: engine.result is not None)
+    done, move = engine.poll()
+    assert done and move in board.get_legal_moves('B')
+    assert engine.get_ponder_stats() == {"hits": 1, "misses": 0}
+
+    board, predicted, other = ponder_on_opening(engine)
+    board.make_move(other)
+    engine.submit(board)
+    wait_for(lambda: engine.result is not None)
+    done, move = engine.poll()
+    assert done and move in board.get_legal_moves('B')
+    assert engine.get_ponder_stats() == {"hits": 1, "misses": 1}
+    engine.close()
+    assert not engine.is_thinking()
+
+def test_poll_while_searching():
+    engine = PonderingEngine(AI('W', max_depth=20, time_limit=0.3), ponder=False)
+    board = Board(get_starting_pieces(), 'W')
+    engine.submit(board)
+    assert engine.poll() == (False, None)
+    wait_for(lambda: engine.result is not None)
+    assert engine.poll()[0]
+    assert engine.poll() == (False, None)
+
+def test_cancel_and_progress():
+    reports = []
+    engine = PonderingEngine(AI('W', max_depth=30, time_limit=60), ponder=False,
+                             progress=lambda depth, score, move, nodes: reports.append((depth, nodes)))
+    engine.submit(Board(get_starting_pieces(), 'W'))
+    wait_for(lambda: engine.get_progress()[0] >= 2)
+    assert engine.is_searching()
+    engine.cancel()
+    assert not engine.is_thinking() and not engine.is_searching()
+    assert engine.poll() == (False, None)
+    assert [depth for depth, _ in reports[:2]] == [1, 2]
@@ -0,0 +1,83 @@
+import sys
+sys.path.append('..')
+import sqlite3
+import threading
+import pytest
+from pool import ConnectionPool, PoolTimeout
+
+def sqlite_connect():
+    return sqlite3.connect(":memory:", check_same_thread=False)
+
+def test_connections_are_reused():
+    pool = ConnectionPool(sqlite_connect, size=2)
+    first = pool.acquire()
+    pool.release(first)
+    second = pool.acquire()
+    assert second is first
+    pool.release(second)
+    assert pool.get_stats()["opened"] == 1
+    assert pool.get_stats()["reused"] == 1
+
+def test_pool_is_bounded():
+    pool = ConnectionPool(sqlite_connect, size=2, timeout=0.05)
+    held = [pool.acquire(), pool.acquire()]
+    with pytest.raises(PoolTimeout):
+        pool.acquire()
+    # A connection given back wakes a waiting thread up
+    got = []
+    waiter = threading.Thread(target=lambda: got.append(pool.acquire()))
+    pool.timeout = 5
+    waiter.start()
+    pool.release(held[0])
+    waiter.join()
+    assert got == [held[0]]
+    assert pool.get_stats()["open"] == 2
+
+def test_stale_connection_is_replaced():
+    pool = ConnectionPool(sqlite_connect, size=1, check_after=0)
+    first = pool.acquire()
+    pool.release(first)
+    # A closed sqlite connection fails the health check
+    first.close()
+    second = pool.acquire()
+    assert second is not first
+    assert second.execute("SELECT 1").fetchone() == (1,)
+    assert pool.get_stats()["replaced"] == 1
+
+def test_broken_connection_frees_its_slot():
+    pool = ConnectionPool(sqlite_connect, size=1)
+    with pytest.raises(sqlite3.OperationalError):
+        with pool.connection(sqlite3.OperationalError) as conn:
+            broken = conn
+            conn.execute("SELECT * FROM missing")
+    assert pool.get_stats()["open"] == 0
+    with pool.connection() as conn:
+        assert conn is not broken
+
+def test_failed_connect_frees_its_slot():
+    attempts = []
+    def connect():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise sqlite3.OperationalError("server gone")
+        return sqlite_connect()
+    pool = ConnectionPool(connect, size=1, timeout=0.05)
+    with pytest.raises(sqlite3.OperationalError):
+        pool.acquire()
+    pool.release(pool.acquire())
+    assert len(attempts) == 2
+
+def test_threads_share_the_pool():
+    pool = ConnectionPool(sqlite_connect, size=3)
+    def worker():
+        for _ in range(50):
+            with pool.connection() as conn:
+                assert conn.execute("SELECT 1").fetchone() == (1,)
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert pool.get_stats()["opened"] <= 3
+    pool.close()
+    assert pool.get_stats()["open"] == 0
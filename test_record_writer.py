@@ -0,0 +1,72 @@
+import sys
+sys.path.append('..')
+import os
+import threading
+from record_writer import RecordWriter
+
+class FakeStorage:
+    # Keeps records in a list, refuses batches while down is set.
+    def __init__(self):
+        self.records = []
+        self.batches = []
+        self.down = False
+        self.thread = None
+
+    def create_records(self, records):
+        self.thread = threading.current_thread()
+        if self.down:
+            return False
+        self.records.extend(records)
+        self.batches.append(len(records))
+        return True
+
+def test_results_are_batched(tmp_path):
+    storage = FakeStorage()
+    writer = RecordWriter(storage, str(tmp_path / "records.spool"), batch_size=4, interval=60)
+    for game in range(10):
+        writer.submit("alice", game % 2 == 0)
+    assert writer.flush(5)
+    assert len(storage.records) == 10 and storage.records[0] == ("alice", True)
+    assert max(storage.batches) <= 4 and len(storage.batches) < 10
+    assert storage.thread is not threading.current_thread()
+    assert not os.path.exists(tmp_path / "records.spool")
+    writer.close()
+
+def test_interval_flushes_without_a_full_batch(tmp_path):
+    storage = FakeStorage()
+    writer = RecordWriter(storage, str(tmp_path / "records.spool"), batch_size=100, interval=0.05)
+    writer.submit("alice", True)
+    writer.thread.join(0.5)
+    assert storage.records == [("alice", True)]
+    writer.close()
+
+def test_spool_survives_a_failed_database(tmp_path):
+    spool = str(tmp_path / "records.spool")
+    storage = FakeStorage()
+    storage.down = True
+    writer = RecordWriter(storage, spool, batch_size=2, interval=60)
+    writer.submit("alice", True)
+    writer.submit("bob", False)
+    writer.submit("carol", True)
+    assert not writer.flush(5)
+    writer.close()
+    assert storage.records == []
+    with open(spool) as spool_file:
+        assert len(spool_file.readlines()) == 3
+
+    # The next writer stores what the first one couldn't
+    storage = FakeStorage()
+    writer = RecordWriter(storage, spool, batch_size=2, interval=60)
+    assert writer.flush(5)
+    assert storage.records == [("alice", True), ("bob", False), ("carol", True)]
+    assert not os.path.exists(spool)
+    writer.close()
+
+def test_torn_spool_line_is_skipped(tmp_path):
+    spool = str(tmp_path / "records.spool")
+    with open(spool, "w") as spool_file:
+        spool_file.write('{"username": "alice", "win": true}\n{"username": "bo')
+    storage = FakeStorage()
+    writer = RecordWriter(storage, spool)
+    writer.close()
+    assert storage.records == [("alice", True)]
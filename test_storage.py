@@ -0,0 +1,58 @@
+import sys
+sys.path.append('..')
+import threading
+import pytest
+from sqlite_storage import SQLiteStorage
+from user_manager import User_manager
+
+@pytest.fixture
+def storage(tmp_path):
+    storage = SQLiteStorage(str(tmp_path / "checkers.db"))
+    yield storage
+    storage.close()
+
+def test_file_uses_wal(storage):
+    with storage.pool.connection() as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+def test_account_flow(storage):
+    pytest.importorskip("bcrypt")
+    manager = User_manager(storage)
+    assert manager.create_user("alice", "secret1", "secret1") == (True, "Successfully created new user")
+    assert manager.create_user("alice", "secret1", "secret1") == (False, "Username already exists")
+    assert manager.verify_login("alice", "secret1") == (True, "Successfully logged in")
+    assert manager.verify_login("alice", "wrong!!") == (False, "Incorrect credentials")
+    assert manager.verify_login("bob", "secret1") == (False, "Incorrect credentials")
+    user = storage.get_user("alice")
+    assert user["username"] == "alice" and user["hash"].startswith("$2")
+
+def test_records_and_stats(storage):
+    assert storage.get_record("alice") == 0.0
+    for win in (True, True, False):
+        assert storage.create_record("alice", win)
+    assert storage.create_record("bob", False)
+    assert storage.get_stats("alice") == {"games": 3, "wins": 2, "losses": 1}
+    assert storage.get_record("alice") == 66.67
+    assert storage.get_record("bob") == 0.0
+
+def test_records_from_threads(storage):
+    def worker():
+        for _ in range(25):
+            storage.create_record("alice", True)
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert storage.get_stats("alice")["games"] == 100
+
+def test_in_memory_storage():
+    storage = SQLiteStorage(":memory:")
+    assert storage.add_user("carol", "salt", "hash")
+    assert not storage.add_user("carol", "salt", "hash")
+    assert storage.get_user("carol") == {"username": "carol", "salt": "salt", "hash": "hash"}
+
+def test_records_in_one_batch(storage):
+    assert storage.create_records([("alice", True), ("alice", False), ("bob", True)])
+    assert storage.get_stats("alice") == {"games": 2, "wins": 1, "losses": 1}
+    assert storage.get_stats("bob") == {"games": 1, "wins": 1, "losses": 0}
@@ -0,0 +1,79 @@
+import sys
+sys.path.append('..')
+import random
+from ai import AI, WIN_SCORE
+from board import Board
+from piece import Piece
+from tablebase import (EndgameTablebase, generate, get_materials, get_table_size, get_index,
+                       get_position, _placements, DRAW, WIN, LOSS)
+
+def test_index_is_perfect_hash():
+    # Every placement of a material gets its own index and no index is left over.
+    for material in [(1, 0, 0, 1), (2, 0, 1, 0), (0, 1, 1, 1)]:
+        indexes = {get_index(material, masks) for masks in _placements(material)}
+        assert indexes == set(range(get_table_size(material)))
+
+def test_position_is_turned_to_side_to_move():
+    # White to move and the same position turned around with black to move share an entry.
+    white = Board([Piece('13WY'), Piece('22WN'), Piece('9BN')], 'W', 'W')
+    black = Board([Piece('18BY'), Piece('9BN'), Piece('22WN')], 'W', 'B')
+    assert get_position(white, 'W') == get_position(black, 'B')
+
+def test_results_agree_with_moves(tmp_path):
+    # Every result follows from the results one move later.
+    generate(2, str(tmp_path), report=lambda line: None)
+    tablebase = EndgameTablebase(str(tmp_path))
+    assert tablebase.get_max_pieces() == 2
+    assert len(get_materials(2)) == 4
+
+    generator = random.Random(1)
+    checked = 0
+    while checked < 300:
+        squares = generator.sample(range(32), 2)
+        names = [str(squares[0]) + 'W' + generator.choice('NY'), str(squares[1]) + 'B' + generator.choice('NY')]
+        board = Board([Piece(name) for name in names], 'W', generator.choice('WB'))
+        entry = tablebase.probe(board)
+        if entry is None:
+            # A man on the row it crowns on
+            continue
+        result, distance = entry
+        checked += 1
+
+        outcomes = []
+        for move in board.get_legal_moves(board.get_turn()):
+            token = board.make_move(move)
+            if bin(board.get_occupied_mask()).count('1') == 1:
+                outcomes.append((LOSS, 0))
+            else:
+                outcomes.append(tablebase.probe(board))
+            board.unmake_move(token)
+
+        losses = [next_distance for next_result, next_distance in outcomes if next_result == LOSS]
+        if result == WIN:
+            assert min(losses) == distance - 1
+        elif result == LOSS:
+            assert all(next_result == WIN for next_result, _ in outcomes)
+            assert max([-1] + [next_distance for _, next_distance in outcomes]) == distance - 1
+        else:
+            assert not losses and (DRAW, 0) in outcomes
+
+def test_search_uses_tablebase(tmp_path):
+    # White wins the man race and the AI sees it without searching to the end.
+    generate(2, str(tmp_path), report=lambda line: None)
+    board = Board([Piece('16WY'), Piece('4BN')], 'W', 'W')
+    engine = AI('W', max_depth=2, tablebase=EndgameTablebase(str(tmp_path)))
+    score, move = engine.search(board)
+    assert score > WIN_SCORE - 100
+    board.make_move(move)
+    assert engine.tablebase.probe(board)[0] == LOSS
+
+def test_illegal_positions_are_not_scored(tmp_path):
+    # A white man on row 0 can't happen in a game, the search evaluates it instead of
+    # taking the table's entry for a result.
+    generate(2, str(tmp_path), report=lambda line: None)
+    tablebase = EndgameTablebase(str(tmp_path))
+    board = Board([Piece('2WN'), Piece('13BN')], 'W', 'W')
+    assert tablebase.probe(board) is None
+    assert tablebase.probe(Board([Piece('6WN'), Piece('13BN')], 'W', 'W')) is not None
+    engine = AI('W', tablebase=tablebase)
+    assert engine.minimax(board, True, 0, 'W') == engine.evaluate(board)
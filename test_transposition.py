@@ -0,0 +1,26 @@
+import sys
+sys.path.append('..')
+from transposition import TranspositionTable, EXACT, LOWER_BOUND
+
+def test_store_and_probe():
+    # A stored entry comes back with its score, depth, bound and best move.
+    table = TranspositionTable(16)
+    table.store(12345, 1.5, 4, LOWER_BOUND, (20, 16))
+    assert table.probe(12345) == (1.5, 4, LOWER_BOUND, (20, 16))
+    assert table.probe(54321) is None
+    assert table.get_stats()["hits"] == 1
+    assert table.get_stats()["misses"] == 1
+
+def test_depth_preferred_replacement():
+    # A shallower result for another position sharing the slot does not evict a deeper one.
+    table = TranspositionTable(1)
+    table.store(1, -2, 6, EXACT)
+    table.store(2, 3, 2, EXACT)
+    assert table.probe(1) == (-2, 6, EXACT, None)
+    assert table.probe(2) is None
+    assert table.get_stats()["collisions"] == 1
+
+    # Entries left over from an earlier search can always be replaced.
+    table.new_search()
+    table.store(2, 3, 2, EXACT)
+    assert table.probe(2) == (3, 2, EXACT, None)
@@ -0,0 +1,42 @@
+import sys
+sys.path.append('..')
+import json
+import pytest
+pytest.importorskip("numpy")
+from ai import AI
+from board import Board, get_starting_pieces
+from evaluator import DEFAULT_WEIGHTS, load_weights, save_weights
+from selfplay import play_game
+from tuner import compute_loss, iter_chunks, tune
+
+@pytest.fixture
+def game_log(tmp_path):
+    path = str(tmp_path / "games.jsonl")
+    with open(path, "w") as log:
+        for number in range(6):
+            log.write(json.dumps(play_game(number, number, 2, 10, 6, 120)) + "\n")
+    return path
+
+def test_chunks_cover_every_position(game_log):
+    # Reading in small chunks sees the same positions as one big chunk.
+    sizes = [len(results) for _, results in iter_chunks([game_log], size=50)]
+    assert max(sizes) == 50
+    assert sum(sizes) == sum(len(results) for _, results in iter_chunks([game_log], size=100000))
+    assert compute_loss([game_log], [1, 0.5, 0, 0, 0], chunk_size=50) == \
+        pytest.approx(compute_loss([game_log], [1, 0.5, 0, 0, 0], chunk_size=100000))
+
+def test_tune_lowers_loss(game_log, tmp_path):
+    losses = []
+    weights = tune([game_log], epochs=3, chunk_size=64, report=lambda epoch, loss: losses.append(loss))
+    assert len(losses) == 3
+    assert set(weights) == set(DEFAULT_WEIGHTS)
+    assert compute_loss([game_log], list(weights.values())) < \
+        compute_loss([game_log], list(DEFAULT_WEIGHTS.values()))
+
+    # The AI loads the weights file written for it.
+    path = str(tmp_path / "weights.json")
+    save_weights(path, weights)
+    assert load_weights(path) == weights
+    engine = AI('W', max_depth=2, weights=path)
+    assert engine.evaluator.get_weights() == pytest.approx(weights)
+    assert engine.search(Board(get_starting_pieces(), 'W'))[1] is not None
@@ -0,0 +1,22 @@
+import sys
+sys.path.append('..')
+from utils import get_row_col_at, get_piece_gui_coords
+
+def test_get_row_col_at_cells():
+    # Every pixel of a cell maps to that cell, the next pixel to the next one.
+    assert get_row_col_at((26, 26), 56, (26, 26)) == (0, 0)
+    assert get_row_col_at((81, 81), 56, (26, 26)) == (0, 0)
+    assert get_row_col_at((82, 81), 56, (26, 26)) == (0, 1)
+    assert get_row_col_at((82, 82), 56, (26, 26)) == (1, 1)
+    assert get_row_col_at((473, 473), 56, (26, 26)) == (7, 7)
+
+def test_get_row_col_at_off_the_grid():
+    assert get_row_col_at((25, 100), 56, (26, 26)) == (1, -1)
+    assert get_row_col_at((474, 474), 56, (26, 26)) == (8, 8)
+
+def test_get_row_col_at_inverts_gui_coords():
+    # The top left corner of a piece drawn on a dark square lies in that square's cell.
+    for row in range(8):
+        for column in range(row % 2, 8, 2):
+            coords = get_piece_gui_coords((row, column), 56, (34, 34))
+            assert get_row_col_at(coords, 56, (26, 26)) == (row, column)
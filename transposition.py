@@ -0,0 +1,120 @@
+# Fixed-size transposition table for the search
+from array import array
+
+
+EXACT = 0
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+
+# Scores are stored as fixed point integers
+SCORE_SCALE = 1000
+SCORE_OFFSET = 1 << 31
+
+NO_SQUARE = 63
+
+# Layout of the packed data word, from the lowest bit up
+_DEPTH_SHIFT = 32
+_FLAG_SHIFT = 40
+_FROM_SHIFT = 42
+_TO_SHIFT = 48
+_GENERATION_SHIFT = 54
+
+DEFAULT_ENTRIES = 1 << 18
+
+
+# Returns how many bytes a table of `entries` positions needs
+def get_table_size(entries):
+    return 16 * entries
+
+
+class TranspositionTable:
+    # Initilize an empty table holding at most `entries` positions, 16 bytes each.
+    # Passing a zeroed buffer, such as shared memory, makes the table live in it:
+    # entries are written key xor data, so a slot torn by a concurrent write from
+    # another process reads back as a miss instead of a wrong entry.
+    def __init__(self, entries=DEFAULT_ENTRIES, buffer=None):
+        if entries < 1:
+            raise ValueError("a transposition table needs at least one entry")
+        self.entries = entries
+        # Two words per entry: the key xor the data, then the data
+        if buffer is None:
+            self.table = array('Q', bytes(get_table_size(entries)))
+        else:
+            self.table = memoryview(buffer).cast('B')[:get_table_size(entries)].cast('Q')
+        self.generation = 1
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0
+        self.stores = 0
+
+    # Start a new search, entries from older searches become replaceable
+    def new_search(self):
+        self.generation = self.generation % 255 + 1
+
+    # Returns (score, depth, flag, best move) stored for a key, or None.
+    # Only the first and last squares of the best move are kept.
+    def probe(self, key):
+        slot = 2 * (key % self.entries)
+        data = self.table[slot + 1]
+        if data == 0:
+            self.misses += 1
+            return None
+        if self.table[slot] ^ data != key:
+            self.collisions += 1
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        score = ((data & 0xFFFFFFFF) - SCORE_OFFSET) / SCORE_SCALE
+        depth = (data >> _DEPTH_SHIFT) & 0xFF
+        flag = (data >> _FLAG_SHIFT) & 0x3
+        position_from = (data >> _FROM_SHIFT) & 0x3F
+        position_to = (data >> _TO_SHIFT) & 0x3F
+        move = None if position_from == NO_SQUARE else (position_from, position_to)
+        return score, depth, flag, move
+
+    # Stores a search result, a deeper entry of the current search is only replaced by the same position
+    def store(self, key, score, depth, flag, move=None):
+        slot = 2 * (key % self.entries)
+        old_data = self.table[slot + 1]
+        if old_data != 0 and self.table[slot] ^ old_data != key:
+            old_depth = (old_data >> _DEPTH_SHIFT) & 0xFF
+            old_generation = (old_data >> _GENERATION_SHIFT) & 0xFF
+            if old_generation == self.generation and old_depth > depth:
+                return
+
+        position_from, position_to = (NO_SQUARE, NO_SQUARE) if move is None else (move[0], move[-1])
+        data = ((int(round(score * SCORE_SCALE)) + SCORE_OFFSET) & 0xFFFFFFFF
+                | min(depth, 0xFF) << _DEPTH_SHIFT
+                | flag << _FLAG_SHIFT
+                | position_from << _FROM_SHIFT
+                | position_to << _TO_SHIFT
+                | self.generation << _GENERATION_SHIFT)
+        self.table[slot] = key ^ data
+        self.table[slot + 1] = data
+        self.stores += 1
+
+    # Forget every stored position and reset the counters
+    def clear(self):
+        self.table[:] = array('Q', bytes(get_table_size(self.entries)))
+        self.generation = 1
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0
+        self.stores = 0
+
+    # Lets go of the buffer the table lives in
+    def close(self):
+        if isinstance(self.table, memoryview):
+            self.table.release()
+        self.table = None
+
+    # Returns the counters used to tune the table size
+    def get_stats(self):
+        return {
+            "entries": self.entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "collisions": self.collisions,
+            "stores": self.stores,
+        }
@@ -0,0 +1,126 @@
+# Fits the evaluation weights to game results (Texel tuning)
+#
+# Every quiet position of the game logs is scored with the batch evaluator
+# and the score is turned into an expected result with a sigmoid. The weights
+# are moved by gradient descent to bring the expected results closer to the
+# results of the games. Positions are read a chunk at a time, an epoch
+# streams the logs again, so the data set never has to fit in memory.
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from ai import WEIGHTS_FILE
+from board import Board, get_starting_pieces
+from book import read_games
+from evaluator import DEFAULT_WEIGHTS, TERMS, encode_masks, compute_features, save_weights
+
+
+DEFAULT_CHUNK = 65536
+DEFAULT_OUTPUT = WEIGHTS_FILE
+
+# Scale of the sigmoid, a score of 1 (one man ahead) expects about 0.62
+DEFAULT_SCALE = 0.5
+
+# Result of a game for white
+RESULT_VALUES = {'W': 1.0, 'B': 0.0, "draw": 0.5}
+
+
+# Yields (white, black, kings, white_up, result for white) for every position
+# of the games where the side to move isn't forced to capture
+def iter_positions(paths, skip_plies=0):
+    for path in paths:
+        for moves, result in read_games(path):
+            value = RESULT_VALUES[result]
+            board = Board(get_starting_pieces(), 'W')
+            for ply, move in enumerate(moves):
+                if ply >= skip_plies and not board.generate_moves(board.get_turn())["must_eat"]:
+                    yield (board.get_color_mask('W'), board.get_color_mask('B'), board.get_king_mask(),
+                           board.get_color_up() == 'W', value)
+                board.make_move(move)
+
+
+# Yields (features, results) arrays of at most `size` positions
+def iter_chunks(paths, size=DEFAULT_CHUNK, skip_plies=0):
+    chunk = []
+    for position in iter_positions(paths, skip_plies):
+        chunk.append(position)
+        if len(chunk) == size:
+            yield _to_arrays(chunk)
+            chunk = []
+    if chunk:
+        yield _to_arrays(chunk)
+
+
+def _to_arrays(chunk):
+    white, black, kings, white_up, results = zip(*chunk)
+    positions = encode_masks(white, black, kings)
+    # Boards where black moves up are turned around
+    turned = ~np.array(white_up)
+    positions[turned] = positions[turned, ::-1]
+    return compute_features(positions).astype(np.float64), np.array(results)
+
+
+# Returns the expected results of feature rows
+def predict(features, weights, scale=DEFAULT_SCALE):
+    return 1 / (1 + np.exp(-scale * (features @ weights)))
+
+
+# Returns the mean squared error of the weights over the logs
+def compute_loss(paths, weights, scale=DEFAULT_SCALE, chunk_size=DEFAULT_CHUNK, skip_plies=0):
+    total = 0.0
+    count = 0
+    for features, results in iter_chunks(paths, chunk_size, skip_plies):
+        total += ((predict(features, weights, scale) - results) ** 2).sum()
+        count += len(results)
+    return total / count if count else 0.0
+
+
+# Fits the weights by gradient descent over the logs and returns them as a dict.
+# Every chunk is one step, report(epoch, loss) is called after each epoch.
+def tune(paths, epochs=10, learning_rate=1.0, scale=DEFAULT_SCALE, chunk_size=DEFAULT_CHUNK,
+         skip_plies=0, weights=None, report=None):
+    start = dict(DEFAULT_WEIGHTS)
+    start.update(weights or {})
+    vector = np.array([start[term] for term in TERMS], dtype=np.float64)
+
+    for epoch in range(1, epochs + 1):
+        total = 0.0
+        count = 0
+        for features, results in iter_chunks(paths, chunk_size, skip_plies):
+            expected = predict(features, vector, scale)
+            error = expected - results
+            total += (error ** 2).sum()
+            count += len(results)
+            gradient = (error * expected * (1 - expected)) @ features * (2 * scale / len(results))
+            vector -= learning_rate * gradient
+        if report is not None:
+            report(epoch, total / count if count else 0.0)
+
+    return {term: float(weight) for term, weight in zip(TERMS, vector)}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Fit the evaluation weights to game results.")
+    parser.add_argument("logs", nargs="+", help="JSONL game logs, e.g. written by selfplay.py")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--epochs", type=int, default=10)
+    parser.add_argument("--learning-rate", type=float, default=1.0)
+    parser.add_argument("--scale", type=float, default=DEFAULT_SCALE)
+    parser.add_argument("--chunk", type=int, default=DEFAULT_CHUNK)
+    parser.add_argument("--skip-plies", type=int, default=8, help="opening plies left out of every game")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    weights = tune(args.logs, args.epochs, args.learning_rate, args.scale, args.chunk, args.skip_plies,
+                   report=lambda epoch, loss: print(f"epoch {epoch:3d}  loss {loss:.6f}  "
+                                                    f"{time.perf_counter() - start:.1f}s"))
+    save_weights(args.output, weights)
+    print(", ".join(f"{term} {weight:.4f}" for term, weight in weights.items()))
+    print(f"weights written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,8 @@
 from __future__ import annotations
 import pygame
 
+from assets import ASSETS
+
 
 
 # Basic Theme of the project
@@ -11,9 +13,9 @@ class Theme:
 
     @classmethod
     def init_fonts(cls) -> None:
-        cls.FONT_SM = pygame.font.SysFont(None, 18)
-        cls.FONT_MD = pygame.font.SysFont(None, 24)
-        cls.FONT_LG = pygame.font.SysFont(None, 32)
+        cls.FONT_SM = ASSETS.get_font(None, 18)
+        cls.FONT_MD = ASSETS.get_font(None, 24)
+        cls.FONT_LG = ASSETS.get_font(None, 32)
         cls._fonts_ready = True
 
     # Colors
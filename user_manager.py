@@ -1,10 +1,46 @@
-from db import Database
+import os
+
+_database = None
+_record_writer = None
+
+
+# Returns the storage, its backend is only imported and set up the first time
+# it is needed. DB_BACKEND picks MySQL ("mysql") or a local SQLite file
+# ("sqlite", at DB_PATH).
+def get_database():
+    global _database
+    if _database is None:
+        if os.getenv("DB_BACKEND", "mysql") == "sqlite":
+            from sqlite_storage import SQLiteStorage, DEFAULT_PATH
+            _database = SQLiteStorage(os.getenv("DB_PATH", DEFAULT_PATH))
+        else:
+            from db import Database
+            _database = Database()
+    return _database
+
+
+# Returns the writer game results are stored through, it starts the first time
+# a result is recorded and keeps its spool at DB_SPOOL
+def get_record_writer():
+    global _record_writer
+    if _record_writer is None:
+        from record_writer import RecordWriter, DEFAULT_SPOOL
+        _record_writer = RecordWriter(get_database(), os.getenv("DB_SPOOL", DEFAULT_SPOOL))
+    return _record_writer
 
-db = Database()
 
 class User_manager:
+    # Initilize the manager, it uses the shared storage unless one is given
+    def __init__(self, database=None):
+        self.database = database
+
+    # Return the storage users are kept in
+    def get_database(self):
+        return self.database if self.database is not None else get_database()
+
     # Validates user credentials to create user
     def create_user(self, username, password, confirm_password) -> tuple[bool, str]:
+        db = self.get_database()
         if db.get_user(username) is not None:
             return False, "Username already exists"
         if len(username) < 3:
@@ -17,9 +53,11 @@ class User_manager:
         return True, "Successfully created new user"
 
     # Validates user credentials to login
-    def verify_login(selfs, username, password) -> tuple[bool, str]:
-        if db.get_user(username) is None:
+    def verify_login(self, username, password) -> tuple[bool, str]:
+        db = self.get_database()
+        user = db.get_user(username)
+        if user is None:
             return False, "Incorrect credentials"
-        if db.correct_password(username, password):
+        if db.correct_password(username, password, user):
             return False, "Incorrect credentials"
         return True, "Successfully logged in"
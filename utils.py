@@ -1,16 +1,9 @@
-# Returns the position with column
-def get_position_with_row_col(row, column):
-    return (row * 4) + (column // 2)
-
-# Returns a pieces position
-def get_piece_position(coords, square_dist, top_left_coords):
-    x_offset = top_left_coords[0]
-    y_offset = top_left_coords[1]
-
-    piece_column = (coords[0] - x_offset) // square_dist
-    piece_row = (coords[1] - y_offset) // square_dist
-
-    return get_position_with_row_col(piece_row, piece_column)
+# Returns the row and column of the grid cell holding a point of the screen,
+# the inverse of get_piece_gui_coords
+def get_row_col_at(coords, square_dist, top_left_coords):
+    column = (coords[0] - top_left_coords[0]) // square_dist
+    row = (coords[1] - top_left_coords[1]) // square_dist
+    return (row, column)
 
 
 # Returns the pieces position on the GUI interface
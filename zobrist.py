@@ -0,0 +1,28 @@
+# Random keys used to hash board positions
+import random
+
+
+# A fixed seed keeps the hashes identical across runs and processes
+_generator = random.Random(0x436865636B657273)
+
+
+def _make_keys():
+    return [_generator.getrandbits(64) for _ in range(32)]
+
+
+# One key per square for every kind of piece
+WHITE_MAN_KEYS = _make_keys()
+BLACK_MAN_KEYS = _make_keys()
+WHITE_KING_KEYS = _make_keys()
+BLACK_KING_KEYS = _make_keys()
+
+# Folded in when black is the side to move
+BLACK_TO_MOVE_KEY = _generator.getrandbits(64)
+
+
+# Returns the key of a piece standing on a square
+def piece_key(color, is_king, position):
+    if color == 'W':
+        return WHITE_KING_KEYS[position] if is_king else WHITE_MAN_KEYS[position]
+    return BLACK_KING_KEYS[position] if is_king else BLACK_MAN_KEYS[position]
+